@@ -7,7 +7,7 @@ from typing import List, Optional
 
 from app import KrakTrader
 from app.publisher import Publisher
-from common import get_logger
+from common import get_logger, new_event_loop
 
 
 async def on_exit(app):
@@ -76,6 +76,7 @@ async def main() -> None:
             secret=secret,
             publisher=Publisher("127.0.0.1", 8889)
         )
+        app.enable_dead_mans_switch(timeout=60, interval=15)
 
         await preload_app(symbols[0], app)
         await start_app(app)
@@ -105,7 +106,7 @@ if __name__ == '__main__':
         gc.collect()
         gc.set_threshold(4096, 10, 10)
 
-        loop = asyncio.new_event_loop()
+        loop = new_event_loop(getenv('KRAKEN_EVENT_LOOP'))
         loop.create_task(main())
         loop.run_forever()
 
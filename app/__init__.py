@@ -1,3 +1,4 @@
 from .krak_trader import KrakTrader
 from .strategy import StupidScalperStrategy
 from .trade_monitor import TradeMonitor
+from .bar_builder import BarBuilder, BarSeries
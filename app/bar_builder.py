@@ -0,0 +1,196 @@
+import math
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+from common import Trade, get_logger
+from kraken import Candle, Ohlc
+
+# seconds per bar built by default: 1s, 1m, 5m, 1h
+DEFAULT_INTERVALS: Tuple[int, ...] = (1, 60, 300, 3600)
+
+
+class BarSeries:
+    """
+    OHLC bars of one interval (seconds) built from trades
+        - the bar in progress is kept in scalars, closed bars in a columnar ring buffer of the last history bars
+        - a trade in a later interval closes the current bar, intervals without trades produce no bar
+        - a trade older than the current bar (out of order) is folded into the current bar, the close stays the
+          price of the latest trade
+        - bars are handed out as kraken.Candle: time is the last trade time, etime the end of the interval
+    """
+    def __init__(self, interval: int, history: int = 1000):
+        self.interval = interval
+        self._capacity = history
+        self._starts: array = array('d', bytes(8 * history))
+        self._last_times: array = array('d', bytes(8 * history))
+        self._opens: array = array('d', bytes(8 * history))
+        self._highs: array = array('d', bytes(8 * history))
+        self._lows: array = array('d', bytes(8 * history))
+        self._closes: array = array('d', bytes(8 * history))
+        self._volumes: array = array('d', bytes(8 * history))
+        self._notionals: array = array('d', bytes(8 * history))
+        self._counts: array = array('q', bytes(8 * history))
+        self._head: int = 0
+        self._count: int = 0
+
+        # bar in progress
+        self._start: float = -math.inf
+        self._last_time: float = 0
+        self._open: float = 0
+        self._high: float = 0
+        self._low: float = 0
+        self._close: float = 0
+        self._volume: float = 0
+        self._notional: float = 0
+        self._trades: int = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def update(self, price: float, volume: float, time: float) -> bool:
+        """
+        :return: True if the trade closed the bar in progress
+        """
+        start: float = time - time % self.interval
+        closed: bool = False
+        if start > self._start:
+            closed = self._close_bar()
+            self._start = start
+            self._open = self._high = self._low = price
+            self._volume = self._notional = 0
+            self._trades = 0
+        elif price > self._high:
+            self._high = price
+        elif price < self._low:
+            self._low = price
+        # an out of order trade still counts towards the bar but must not overwrite the latest close
+        if time >= self._last_time:
+            self._close = price
+            self._last_time = time
+        self._volume += volume
+        self._notional += price * volume
+        self._trades += 1
+        return closed
+
+    def _close_bar(self) -> bool:
+        if not self._trades:
+            return False
+        i: int = self._head
+        self._starts[i] = self._start
+        self._last_times[i] = self._last_time
+        self._opens[i] = self._open
+        self._highs[i] = self._high
+        self._lows[i] = self._low
+        self._closes[i] = self._close
+        self._volumes[i] = self._volume
+        self._notionals[i] = self._notional
+        self._counts[i] = self._trades
+        self._head = (i + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+        return True
+
+    def current(self) -> Optional[Candle]:
+        if not self._trades:
+            return None
+        return Candle(
+            self._last_time,
+            self._start + self.interval,
+            self._open,
+            self._high,
+            self._low,
+            self._close,
+            self._notional / self._volume if self._volume else self._close,
+            self._volume,
+            self._trades
+        )
+
+    def _index(self, n: int) -> int:
+        """
+        ring index of the n-th closed bar, 0 is the oldest
+        """
+        return (self._head - self._count + n) % self._capacity
+
+    def _candle(self, i: int) -> Candle:
+        return Candle(
+            self._last_times[i],
+            self._starts[i] + self.interval,
+            self._opens[i],
+            self._highs[i],
+            self._lows[i],
+            self._closes[i],
+            self._notionals[i] / self._volumes[i] if self._volumes[i] else self._closes[i],
+            self._volumes[i],
+            self._counts[i]
+        )
+
+    def last(self) -> Optional[Candle]:
+        """
+        :return: the last closed bar
+        """
+        return self._candle(self._index(self._count - 1)) if self._count else None
+
+    def bars(self) -> List[Candle]:
+        """
+        :return: the closed bars, oldest first
+        """
+        return [self._candle(self._index(n)) for n in range(self._count)]
+
+    def reconcile(self, candle: Candle) -> bool:
+        """
+        replaces the bar covering the candle's interval with the exchange's values if they differ
+            - closed bars are always replaced, the bar in progress only if kraken has seen at least as many trades
+        :return: True if a bar was corrected
+        """
+        start: float = float(candle.etime) - self.interval
+        count: int = int(candle.count)
+        values: Tuple[float, ...] = (
+            float(candle.open), float(candle.high), float(candle.low), float(candle.close), float(candle.volume)
+        )
+        if start == self._start:
+            if count < self._trades or (self._open, self._high, self._low, self._close, self._volume) == values:
+                return False
+            self._open, self._high, self._low, self._close, self._volume = values
+            self._notional = float(candle.vwap) * self._volume
+            self._trades = count
+            return True
+
+        for n in range(self._count - 1, -1, -1):
+            i: int = self._index(n)
+            if self._starts[i] < start:
+                return False
+            if self._starts[i] == start:
+                if (self._opens[i], self._highs[i], self._lows[i], self._closes[i], self._volumes[i]) == values:
+                    return False
+                self._opens[i], self._highs[i], self._lows[i], self._closes[i], self._volumes[i] = values
+                self._notionals[i] = float(candle.vwap) * self._volumes[i]
+                self._counts[i] = count
+                return True
+        return False
+
+
+class BarBuilder:
+    """
+    bars of several intervals built in process from the trade stream, O(1) per trade and interval
+        - replaces one ohlc-N subscription per interval, and adds intervals kraken does not offer (1s)
+        - when ohlc-N is subscribed anyway, on_ohlc reconciles the matching series against kraken's candles
+          (N minutes), a correction usually means trades were missed, eg. across a reconnect
+    """
+    def __init__(self, intervals: Tuple[int, ...] = DEFAULT_INTERVALS, history: int = 1000):
+        self._series: Dict[int, BarSeries] = {interval: BarSeries(interval, history) for interval in intervals}
+        self._series_list: List[BarSeries] = list(self._series.values())
+        self.corrections: int = 0
+        self._logger = get_logger(__name__)
+
+    def series(self, interval: int) -> BarSeries:
+        return self._series[interval]
+
+    def on_trade(self, trade: Trade) -> None:
+        for series in self._series_list:
+            series.update(trade.price, trade.volume, trade.time)
+
+    def on_ohlc(self, ohlc: Ohlc) -> None:
+        _, _, minutes = ohlc.channelName.partition('-')
+        series: Optional[BarSeries] = self._series.get(int(minutes) * 60) if minutes.isdigit() else None
+        if series and series.reconcile(ohlc.candle):
+            self.corrections += 1
+            self._logger.warning(f'{ohlc.channelName} bar corrected from kraken: {ohlc.candle}')
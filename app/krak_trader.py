@@ -1,9 +1,10 @@
 import sys
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 import app
 from .publisher import Publisher
 from kraken import (
+    CancelAllOrdersAfterStatus,
     SubscriptionStatus,
     SymbolConfigMap,
     CancelAllStatus,
@@ -22,7 +23,6 @@ from common import (
     WorkingOrderBook,
     PositionManager,
     get_logger,
-    FinMath,
     Order,
     Trade,
     Side,
@@ -46,53 +46,61 @@ class KrakTrader(KrakApp):
         http_url: str,
         key: str,
         secret: str,
-        publisher: Publisher = None
+        publisher: Publisher = None,
+        fixed_point: bool = False,
+        queue_size: int = 0
     ):
-        super().__init__(url, auth_url, http_url, key, secret)
+        super().__init__(url, auth_url, http_url, key, secret, queue_size)
         self._symbol = symbol
         self._symbol_config: SymbolConfig = SymbolConfigMap[symbol]
+        self._fixed_point = fixed_point
         self._book: Optional[Book] = None
         self._workingorders: WorkingOrderBook = WorkingOrderBook()
         self._position_tracker: PositionManager = PositionManager()
-        self._subscriptions = []
-        self._system_status = None
+        # latest status per (channelName, pair), replayed to new UI connections
+        self._subscriptions: Dict[Tuple[Any, ...], SubscriptionStatus] = {}
+        self._system_status: Optional[SystemStatus] = None
         self._strategy: app.StupidScalperStrategy = app.StupidScalperStrategy(self, self._symbol_config)
         self._trade_monitor: app.TradeMonitor = app.TradeMonitor(self._symbol_config)
+        self._bar_builder: app.BarBuilder = app.BarBuilder()
         self._logger = get_logger(__name__)
 
         #
-        if publisher:
-            self._publisher = publisher
+        self._publisher = publisher
+        if self._publisher:
             self._publisher.on_new_connection(self.on_new_ui_connection)
             self._publisher.on_receive_message(self.on_receive_ui_nos, 'new_order_single')
             self._publisher.on_receive_message(self.on_receive_ui_cancel, 'cancel_order')
 
     async def on_new_ui_connection(self):
         await self._publisher.publish(
-            self._symbol_config
+            'symbol_config', self._symbol_config
         )
         await self._publisher.publish(
-            self._workingorders.orders
+            'orders', self._workingorders.orders
         )
 
         for trade in self._trade_monitor.trades():
-            await self._publisher.publish(trade)
+            await self._publisher.publish('trade', trade)
 
-        for sub in self._subscriptions:
-            await self._publisher.publish(sub)
+        for sub in self._subscriptions.values():
+            await self._publisher.publish('subscription', sub)
 
-        await self._publisher.publish(self._system_status)
+        if self._system_status:
+            await self._publisher.publish('system_status', self._system_status)
 
         await self._publisher.publish(
-            self._position_tracker.get_position(self._symbol)
+            'position', self._position_tracker.get_position(self._symbol)
         )
 
     @log
     async def on_receive_ui_cancel(self, *args):
         message = args[0]
-        order: Order = self._workingorders.get_order(message['order_id'])
-        if order:
-            await self.cancel_order(order)
+        order: Optional[Order] = self._workingorders.get_order(message['order_id'])
+        if not order:
+            self._logger.warning(f'cancel from UI for unknown order {message["order_id"]}')
+            return
+        await self.cancel_order(order)
 
     @log
     async def on_receive_ui_nos(self, *args):
@@ -116,13 +124,22 @@ class KrakTrader(KrakApp):
         await super().start(tasks=tasks)
 
     async def on_book_update_snapshot(self, snapshot: BookSnapshot) -> None:
-        self._book = Book(snapshot)
+        if self._book:
+            self._book.clear()
+        self._book = Book(snapshot, symbol_config=self._symbol_config if self._fixed_point else None)
         if self._publisher:
-            await self._publisher.publish(self._book)
+            await self._publisher.publish('book', self._book)
+
+    @log
+    async def on_book_invalidated(self) -> None:
+        if self._book:
+            self._book.clear()
+        self._book = None
 
     async def on_book_update(self, update: BookUpdate) -> None:
         if self._book:
             self._book.update(update)
+            self._position_tracker.mark(self._symbol, self._book.mid())
 
             #await self._strategy.update()
 
@@ -130,19 +147,19 @@ class KrakTrader(KrakApp):
                 self._logger.warning(f"crossed book: {self._book.best_bid()}/{self._book.best_ask()}")
 
             if self._publisher:
-                await self._publisher.publish(self._book)
-                await self._publisher.publish([FinMath.vwap(self._book.asks, 3), FinMath.vwap(self._book.bids, 3)])
+                await self._publisher.publish('book', self._book)
+                await self._publisher.publish('vwap', self._book)
         else:
             self._logger.warning(f'STALE QUOTES -> book update received before snapshot')
 
-    @log
     async def on_ohlc(self, ohlc: Ohlc) -> None:
-        pass
+        self._bar_builder.on_ohlc(ohlc)
 
     async def on_trade(self, trade: Trade) -> None:
         self._trade_monitor.update(trade)
+        self._bar_builder.on_trade(trade)
         if self._publisher:
-            await self._publisher.publish(trade)
+            await self._publisher.publish('trade', trade)
 
     @log
     async def on_ticker(self, ticker: Ticker) -> None:
@@ -154,15 +171,15 @@ class KrakTrader(KrakApp):
 
     @log
     async def on_subscription_status(self, status: SubscriptionStatus) -> None:
-        self._subscriptions.append(status)
+        self._subscriptions[(status.channelName, status.pair)] = status
         if self._publisher:
-            await self._publisher.publish(status)
+            await self._publisher.publish('subscription', status)
 
     @log
     async def on_system_status(self, state: SystemStatus) -> None:
         self._system_status = state
         if self._publisher:
-            await self._publisher.publish(state)
+            await self._publisher.publish('system_status', state)
 
     @log
     async def on_open_order_pending(self, pending: Order) -> None:
@@ -172,13 +189,13 @@ class KrakTrader(KrakApp):
     async def on_open_order_new(self, order_id: str) -> None:
         self._workingorders.on_open_order_new(order_id)
         if self._publisher:
-            await self._publisher.publish(self._workingorders.orders)
+            await self._publisher.publish('orders', self._workingorders.orders)
 
     @log
     async def on_open_order_cancel(self, order_id: str) -> None:
         self._workingorders.on_open_order_cancel(order_id)
         if self._publisher:
-            await self._publisher.publish(self._workingorders.orders)
+            await self._publisher.publish('orders', self._workingorders.orders)
 
     @log
     async def on_new_order_single(self, pending: Order) -> None:
@@ -200,49 +217,62 @@ class KrakTrader(KrakApp):
     async def on_replace_order_ack(self, order_id: Optional[str], clorder_id: int) -> None:
         self._workingorders.replace_order_ack(order_id, clorder_id)
         if self._publisher:
-            await self._publisher.publish(self._workingorders.orders)
+            await self._publisher.publish('orders', self._workingorders.orders)
 
     @log
     async def on_cancel_order_ack(self, clorder_id: int) -> None:
         self._workingorders.cancel_order_ack(clorder_id)
         if self._publisher:
-            await self._publisher.publish(self._workingorders.orders)
+            await self._publisher.publish('orders', self._workingorders.orders)
 
     @log
     async def on_new_order_reject(self, status: OrderStatus) -> None:
         self._workingorders.remove_pending(status.reqid)
         if self._publisher:
-            await self._publisher.publish(status)
+            await self._publisher.publish('order_status', status)
 
     @log
     async def on_replace_order_reject(self, status: OrderStatus) -> None:
         self._workingorders.remove_pending(status.reqid)
         if self._publisher:
-            await self._publisher.publish(status)
+            await self._publisher.publish('order_status', status)
 
     @log
     async def on_cancel_order_reject(self, status: OrderStatus) -> None:
         self._workingorders.remove_pending(status.reqid)
         if self._publisher:
-            await self._publisher.publish(status)
+            await self._publisher.publish('order_status', status)
 
     @log
     async def on_fill(self, fill: Fill) -> None:
         self._workingorders.fill(fill)
         self._position_tracker.add_fill(fill)
         if self._publisher:
-            await self._publisher.publish(self._workingorders.orders)
+            await self._publisher.publish('orders', self._workingorders.orders)
             await self._publisher.publish(
-                self._position_tracker.get_position(self._symbol)
+                'position', self._position_tracker.get_position(self._symbol)
             )
 
     @log
     async def on_cancel_all(self, status: CancelAllStatus) -> None:
         self._workingorders.cancel_all()
         if self._publisher:
-            await self._publisher.publish(self._workingorders.orders)
+            await self._publisher.publish('orders', self._workingorders.orders)
 
     @log
     async def on_cancel_all_reject(self, status: CancelAllStatus) -> None:
         if self._publisher:
-            await self._publisher.publish(status)
+            await self._publisher.publish('order_status', status)
+
+    @log
+    async def on_cancel_all_after_status(self, status: CancelAllOrdersAfterStatus) -> None:
+        ...
+
+    @log
+    async def on_cancel_all_after_status_reject(self, status: CancelAllOrdersAfterStatus) -> None:
+        if self._publisher:
+            await self._publisher.publish('order_status', status)
+
+    @log
+    async def on_dead_mans_switch_alert(self, reason: str) -> None:
+        ...
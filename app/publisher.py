@@ -1,32 +1,133 @@
-import json
-import jsonpickle
+import asyncio
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple, Union
+
 import websockets
-from common import get_logger
+from common import get_logger, get_codec
+from . import ui_schema
+
+SLOW_CLIENT_POLICIES = ('drop', 'disconnect')
+
+# max frames per second of the conflated topics, the other topics are sent on every publish
+DEFAULT_RATES: Dict[str, float] = {
+    'book': 10,
+    'vwap': 10,
+    'position': 4
+}
+
+
+class Subscriber:
+    """
+    one UI connection, frames are queued on a bounded send buffer and written to the socket by its own task
+        - binary subscribers negotiated the msgpack subprotocol, the others receive json text frames
+        - frames of conflated topics may be dropped when the buffer is full, edge triggered frames never are
+    """
+    def __init__(self, websocket, buffer_size: int):
+        self.websocket = websocket
+        self.binary: bool = ui_schema.is_binary(websocket.subprotocol)
+        self.buffer_size = buffer_size
+        # (conflatable, frame)
+        self.frames: Deque[Tuple[bool, Union[str, bytes]]] = deque()
+        self.dropped: int = 0
+        self.task: Optional[asyncio.Task] = None
+        self._ready: asyncio.Event = asyncio.Event()
+
+    def full(self) -> bool:
+        return len(self.frames) >= self.buffer_size
+
+    def push(self, frame: Union[str, bytes], conflatable: bool) -> bool:
+        """
+        queues a frame, a full buffer makes room by dropping its oldest conflatable frame, or drops the new frame
+        if it is conflatable and nothing queued is
+        :return: False if the frame is edge triggered and the full buffer holds only edge triggered frames
+        """
+        if len(self.frames) >= self.buffer_size:
+            for i, (queued_conflatable, _) in enumerate(self.frames):
+                if queued_conflatable:
+                    del self.frames[i]
+                    break
+            else:
+                if not conflatable:
+                    return False
+                self.dropped += 1
+                return True
+            self.dropped += 1
+        self.frames.append((conflatable, frame))
+        self._ready.set()
+        return True
+
+    async def run(self) -> None:
+        while True:
+            while self.frames:
+                await self.websocket.send(self.frames.popleft()[1])
+            self._ready.clear()
+            await self._ready.wait()
 
 
 class Publisher:
-    def __init__(self, host, port):
+    """
+    websocket server broadcasting to the UI
+        - messages are published under a topic and framed with the versioned schema in app.ui_schema,
+          clients choose json or msgpack frames through the websocket subprotocol
+        - publish encodes each message once per format in use and queues the frame on every subscriber's send buffer without
+          waiting for any socket, so a slow client delays neither the other clients nor the trading loop
+        - a subscriber whose buffer (buffer_size frames) is full is handled by slow_client_policy: drop discards
+          its oldest queued frame of a conflated topic, disconnect closes the connection. edge triggered frames
+          are never dropped, a client whose full buffer holds nothing else is disconnected and resyncs with
+          the snapshot sent on its next connection
+        - topics in rates (max frames per second) are conflated: publish only keeps the latest message and a timer
+          task encodes and sends it at most rate times per second, so their cost does not grow with the market
+          data rate. messages are encoded when sent, a mutable message (the book) goes out in its latest state
+        - the other topics (orders, trade, order_status, ...) are edge triggered and sent on every publish
+    """
+    def __init__(
+        self,
+        host,
+        port,
+        buffer_size: int = 256,
+        slow_client_policy: str = 'drop',
+        rates: Optional[Dict[str, float]] = None
+    ):
+        if slow_client_policy not in SLOW_CLIENT_POLICIES:
+            raise ValueError(f'unknown slow client policy {slow_client_policy}, expected one of {SLOW_CLIENT_POLICIES}')
+        rates = DEFAULT_RATES if rates is None else rates
+        for topic, rate in rates.items():
+            if topic not in ui_schema.TOPIC_ENCODERS:
+                raise ValueError(f'unknown topic {topic}')
+            if rate <= 0:
+                raise ValueError(f'rate of {topic} must be positive, got {rate}')
         self._host = host
         self._port = port
-        self._subs = []
-        self.callbacks = {}
+        self._buffer_size = buffer_size
+        self._slow_client_policy = slow_client_policy
+        self._intervals: Dict[str, float] = {topic: 1 / rate for topic, rate in rates.items()}
+        self._latest: Dict[str, Any] = {}
+        self._due: Dict[str, float] = {topic: 0 for topic in self._intervals}
+        self._conflated: Dict[str, int] = {topic: 0 for topic in self._intervals}
+        self._subs: List[Subscriber] = []
+        self.callbacks: Dict[str, Callable[..., Any]] = {}
+        self._codec = get_codec()
         self._logger = get_logger(__name__)
 
     async def _handler(self, websocket, path):
-        self._logger.info(f"new connection received: {path}")
-        self._subs.append(websocket)
+        self._logger.info(f"new connection received: {path} ({websocket.subprotocol or ui_schema.FORMAT_JSON})")
+        sub: Subscriber = Subscriber(websocket, self._buffer_size)
+        sub.task = asyncio.create_task(sub.run())
+        self._subs.append(sub)
         on_new_connection = self.callbacks.get('new_connection')
         if on_new_connection:
             await on_new_connection()
         try:
             while True:
                 message = await websocket.recv()
-                js = json.loads(message)
+                js = ui_schema.loads(message, self._codec)
                 callback = self.callbacks.get(js['topic'])
                 if callback:
                     await callback(js)
         finally:
-            self._subs.remove(websocket)
+            if sub in self._subs:
+                self._subs.remove(sub)
+            sub.task.cancel()
 
     def on_new_connection(self, func):
         self.callbacks['new_connection'] = func
@@ -34,15 +135,66 @@ class Publisher:
     def on_receive_message(self, func, topic):
         self.callbacks[topic] = func
 
-    async def publish(self, message):
-        for ws in self._subs:
-            await ws.send(jsonpickle.encode(message))
+    def get_stats(self) -> dict:
+        return {
+            'subscribers': len(self._subs),
+            'queued': [len(sub.frames) for sub in self._subs],
+            'dropped': [sub.dropped for sub in self._subs],
+            'conflated': dict(self._conflated)
+        }
+
+    async def publish(self, topic: str, message: Any) -> None:
+        if not self._subs:
+            return
+        if topic in self._intervals:
+            if topic in self._latest:
+                self._conflated[topic] += 1
+            self._latest[topic] = message
+            return
+        self._broadcast(topic, message)
+
+    async def _run_conflation(self) -> None:
+        loop = asyncio.get_running_loop()
+        tick: float = min(self._intervals.values())
+        while True:
+            await asyncio.sleep(tick)
+            now: float = loop.time()
+            for topic, interval in self._intervals.items():
+                if topic in self._latest and now >= self._due[topic]:
+                    message: Any = self._latest.pop(topic)
+                    if self._subs:
+                        self._broadcast(topic, message)
+                    self._due[topic] = now + interval
+
+    def _broadcast(self, topic: str, message: Any) -> None:
+        frame: Dict[str, Any] = ui_schema.encode(topic, message)
+        encoded: Dict[bool, Union[str, bytes]] = {}
+        conflatable: bool = topic in self._intervals
+        for sub in list(self._subs):
+            if self._slow_client_policy == 'disconnect' and sub.full():
+                self._disconnect(sub, 'slow client')
+                continue
+            data: Optional[Union[str, bytes]] = encoded.get(sub.binary)
+            if data is None:
+                data = encoded[sub.binary] = ui_schema.dumps(frame, self._codec, sub.binary)
+            if not sub.push(data, conflatable):
+                self._disconnect(sub, f'slow client would miss a {topic} frame, resync')
+
+    def _disconnect(self, sub: Subscriber, reason: str) -> None:
+        self._logger.warning(f'disconnecting {sub.websocket.remote_address}: {reason}')
+        self._subs.remove(sub)
+        sub.task.cancel()  # type: ignore
+        asyncio.ensure_future(sub.websocket.close())
 
     async def start(self):
-        server = await websockets.serve(
+        server = await websockets.serve(  # type: ignore[attr-defined]
             self._handler,
             self._host,
-            self._port
+            self._port,
+            subprotocols=ui_schema.formats()
         )
         self._logger.info(f"serving websocket on {self._host}:{self._port}")
-        await server.serve_forever()
+        if self._intervals:
+            await asyncio.gather(server.serve_forever(), self._run_conflation())
+        else:
+            await server.serve_forever()
@@ -1,31 +1,150 @@
-from queue import LifoQueue
-from typing import Dict, Optional
+from array import array
+from typing import Dict, List, Optional
 
 from common import Trade
 from kraken import SymbolConfig
 
+# volume profile levels with less volume than this are dropped, volumes are floats
+VOLUME_EPSILON: float = 1e-12
+
 
 class TradeMonitor:
-    def __init__(self, symbol_config: SymbolConfig):
+    """
+    the last capacity trades of one symbol in a preallocated columnar ring buffer
+        - price, volume, time, side and order type live in array columns, nothing is allocated per trade
+        - vwap, buy/sell volume, trade rate and the per tick volume profile (get_aggregate) are updated as trades
+          enter and leave the window, every query is O(1) whatever the capacity
+        - the running sums are rebuilt from the columns once every capacity evictions so float error cannot
+          build up, which keeps the amortized cost per trade O(1)
+    """
+    def __init__(self, symbol_config: SymbolConfig, capacity: int = 100):
         self._symbol_config = symbol_config
-        self._trades: LifoQueue[Trade] = LifoQueue(maxsize=100)
+        # nearest tick, as BookSide keys its levels: an off-grid print must not raise halfway through an update
+        self._ticks_per_unit: float = 1 / symbol_config.tick_size
+        self._capacity = capacity
+        self._prices: array = array('d', bytes(8 * capacity))
+        self._volumes: array = array('d', bytes(8 * capacity))
+        self._times: array = array('d', bytes(8 * capacity))
+        self._sides: array = array('b', bytes(capacity))
+        self._order_types: array = array('b', bytes(capacity))
+        self._head: int = 0
+        self._count: int = 0
+        self._evictions: int = 0
+
+        #
+        self._notional: float = 0
+        self._buy_volume: float = 0
+        self._sell_volume: float = 0
+        self._profile: Dict[int, float] = {}
 
-    def trades(self):
-        return list(self._trades.queue)
+    def __len__(self) -> int:
+        return self._count
+
+    def trades(self) -> List[Trade]:
+        """
+        :return: the trades in the window, oldest first
+        """
+        trades: List[Trade] = []
+        for n in range(self._count):
+            i: int = (self._head - self._count + n) % self._capacity
+            trades.append(Trade(
+                self._prices[i],
+                self._volumes[i],
+                self._times[i],
+                'b' if self._sides[i] > 0 else 's',
+                'l' if self._order_types[i] else 'm'
+            ))
+        return trades
 
     def get_aggregate(self) -> Dict[int, float]:
-        aggregates: Dict[int, float] = {}
-        for trade in list(self._trades.queue):
-            price: int = int(trade.price / self._symbol_config.tick_size)
-            qty: Optional[float] = aggregates.get(price, None)
-            if not qty:
-                aggregates[price] = trade.volume
-            else:
-                aggregates[price] += trade.volume
-        return aggregates
-
-    def update(self, trade: Trade):
-        if self._trades.full():
-            self._trades.get()
-        self._trades.put(trade)
-        #print(self.get_aggregate())
+        """
+        :return: traded volume per price in ticks of tick_size (nearest tick), do not modify
+        """
+        return self._profile
+
+    def volume(self) -> float:
+        return self._buy_volume + self._sell_volume
+
+    def buy_volume(self) -> float:
+        return self._buy_volume
+
+    def sell_volume(self) -> float:
+        return self._sell_volume
+
+    def vwap(self) -> Optional[float]:
+        volume: float = self._buy_volume + self._sell_volume
+        return self._notional / volume if volume > 0 else None
+
+    def trade_rate(self) -> float:
+        """
+        :return: trades per second over the window
+        """
+        if self._count < 2:
+            return 0
+        newest: float = self._times[(self._head - 1) % self._capacity]
+        oldest: float = self._times[(self._head - self._count) % self._capacity]
+        return (self._count - 1) / (newest - oldest) if newest > oldest else 0
+
+    def get_stats(self) -> dict:
+        return {
+            'trades': self._count,
+            'capacity': self._capacity,
+            'vwap': self.vwap(),
+            'volume': self.volume(),
+            'buy_volume': self._buy_volume,
+            'sell_volume': self._sell_volume,
+            'trade_rate': self.trade_rate()
+        }
+
+    def update(self, trade: Trade) -> None:
+        i: int = self._head
+        if self._count == self._capacity:
+            self._remove(i)
+        else:
+            self._count += 1
+
+        is_buy: bool = trade.side == 'b'
+        self._prices[i] = trade.price
+        self._volumes[i] = trade.volume
+        self._times[i] = trade.time
+        self._sides[i] = 1 if is_buy else -1
+        self._order_types[i] = 1 if trade.order_type == 'l' else 0
+        self._head = (i + 1) % self._capacity
+        self._add(i)
+
+        if self._evictions >= self._capacity:
+            self._rebuild()
+
+    def _add(self, i: int) -> None:
+        volume: float = self._volumes[i]
+        self._notional += self._prices[i] * volume
+        if self._sides[i] > 0:
+            self._buy_volume += volume
+        else:
+            self._sell_volume += volume
+        tick: int = round(self._prices[i] * self._ticks_per_unit)
+        self._profile[tick] = self._profile.get(tick, 0) + volume
+
+    def _remove(self, i: int) -> None:
+        volume: float = self._volumes[i]
+        self._notional -= self._prices[i] * volume
+        if self._sides[i] > 0:
+            self._buy_volume -= volume
+        else:
+            self._sell_volume -= volume
+        tick: int = round(self._prices[i] * self._ticks_per_unit)
+        remaining: float = self._profile.get(tick, 0) - volume
+        if remaining > VOLUME_EPSILON:
+            self._profile[tick] = remaining
+        else:
+            self._profile.pop(tick, None)
+        self._evictions += 1
+
+    def _rebuild(self) -> None:
+        self._notional = 0
+        self._buy_volume = 0
+        self._sell_volume = 0
+        self._profile.clear()
+        for n in range(self._count):
+            self._add((self._head - self._count + n) % self._capacity)
+        self._evictions = 0
@@ -0,0 +1,113 @@
+"""
+wire schema of the UI feed, version SCHEMA_VERSION
+    - every frame is {"v": SCHEMA_VERSION, "topic": <topic>, "data": <data>}, data per topic:
+        book           {"symbol": str, "bids": [[price, volume], ...], "asks": [[price, volume], ...]}, best first
+        vwap           [[ask price, ask volume], [bid price, bid volume]] over VWAP_DEPTH levels, published as the book
+        trade          [price, volume, time, side ("b"/"s"), order type ("l"/"m")]
+        orders         [[order_id, side ("b"/"s"), price, qty, cum_qty, status], ...]
+        position       [symbol, qty, avg_price, realized_pnl, unrealized_pnl]
+        order_status   {"event", "status", "reqid", "descr", "errorMessage"}
+        subscription   {"channelName", "pair", "status"}
+        system_status  {"event", "status", "version"}
+        symbol_config  {"name", "tick_size", "minimum_lot_size"}
+    - frames are json text, or msgpack binary for connections that negotiate the FORMAT_MSGPACK subprotocol
+"""
+from typing import Any, Callable, Dict, List, Optional, Type, Union
+
+try:
+    import msgpack  # type: ignore
+except ImportError:
+    msgpack = None  # type: ignore
+
+from common import FinMath, JsonCodec, Order, Quote, Side
+
+SCHEMA_VERSION: int = 1
+
+FORMAT_JSON: str = 'kraktrader.v1.json'
+FORMAT_MSGPACK: str = 'kraktrader.v1.msgpack'
+
+VWAP_DEPTH: int = 3
+
+
+def _side(side: Side) -> str:
+    return 'b' if side == Side.BUY else 's'
+
+
+def _levels(quotes: List[Quote]) -> List[List[float]]:
+    return [[quote.price, quote.volume] for quote in quotes]
+
+
+def _book(book: Any) -> Dict[str, Any]:
+    return {'symbol': book.symbol, 'bids': _levels(book.bids), 'asks': _levels(book.asks)}
+
+
+def _vwap(book: Any) -> List[List[float]]:
+    return _levels([FinMath.vwap(book.asks, VWAP_DEPTH), FinMath.vwap(book.bids, VWAP_DEPTH)])
+
+
+def _trade(trade: Any) -> List[Any]:
+    return [trade.price, trade.volume, trade.time, trade.side, trade.order_type]
+
+
+def _order(order: Order) -> List[Any]:
+    return [order.order_id, _side(order.side), order.price, order.qty, order.cum_qty, order.order_status]
+
+
+def _orders(orders: Dict[str, Order]) -> List[List[Any]]:
+    return [_order(order) for order in orders.values()]
+
+
+def _position(position: Any) -> List[Any]:
+    return [position.symbol, position.qty, position.avg_price, position.realized_pnl, position.unrealized_pnl]
+
+
+def _fields(*names: str) -> Callable[[Any], Dict[str, Any]]:
+    def _encode(message: Any) -> Dict[str, Any]:
+        return {name: getattr(message, name, None) for name in names}
+    return _encode
+
+
+TOPIC_ENCODERS: Dict[str, Callable[[Any], Any]] = {
+    'book': _book,
+    'vwap': _vwap,
+    'trade': _trade,
+    'orders': _orders,
+    'position': _position,
+    'order_status': _fields('event', 'status', 'reqid', 'descr', 'errorMessage'),
+    'subscription': _fields('channelName', 'pair', 'status'),
+    'system_status': _fields('event', 'status', 'version'),
+    'symbol_config': _fields('name', 'tick_size', 'minimum_lot_size')
+}
+
+
+def encode(topic: str, message: Any) -> Dict[str, Any]:
+    """
+    :return: the frame of a message as plain lists and dicts, ready for json or msgpack
+    """
+    return {'v': SCHEMA_VERSION, 'topic': topic, 'data': TOPIC_ENCODERS[topic](message)}
+
+
+def dumps(frame: Dict[str, Any], codec: Type[JsonCodec], binary: bool = False) -> Union[str, bytes]:
+    if binary:
+        return msgpack.packb(frame)
+    return codec.dumps(frame)
+
+
+def loads(data: Union[str, bytes], codec: Type[JsonCodec]) -> Any:
+    """
+    decodes a frame, binary frames are msgpack
+    """
+    if isinstance(data, bytes) and msgpack:
+        return msgpack.unpackb(data)
+    return codec.loads(data)
+
+
+def formats() -> List[str]:
+    """
+    :return: the subprotocols this process can serve, preferred first
+    """
+    return [FORMAT_MSGPACK, FORMAT_JSON] if msgpack else [FORMAT_JSON]
+
+
+def is_binary(subprotocol: Optional[str]) -> bool:
+    return subprotocol == FORMAT_MSGPACK
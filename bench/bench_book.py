@@ -0,0 +1,65 @@
+"""
+per-update cost of kraken.Book at each kraken book depth
+    - run from the repository root: python -m bench.bench_book
+    - the book is seeded with a full snapshot, then a stream of random inserts, updates and deletes
+      around the touch is applied; adding and removing levels shifts the sorted key list, so cost per update
+      grows slowly with depth
+    - each update goes through the same path as KrakApp.on_book: pooled BookUpdate, Book.update, release
+"""
+import random
+import time
+from typing import List
+
+from common import Quote
+from kraken import Book, BookSnapshot, BookUpdate, bookUpdatePool
+
+DEPTHS: List[int] = [10, 25, 100, 500, 1000]
+N_UPDATES: int = 200_000
+TICK: float = 0.1
+MID: float = 20000.0
+
+
+def _snapshot(depth: int) -> BookSnapshot:
+    bids: List[List[str]] = [[f'{MID - TICK * (x + 1):.1f}', '1.0', '0'] for x in range(depth)]
+    asks: List[List[str]] = [[f'{MID + TICK * (x + 1):.1f}', '1.0', '0'] for x in range(depth)]
+    return BookSnapshot(0, {'bs': bids, 'as': asks}, f'book-{depth}', 'XBT/USD')
+
+
+def _updates(depth: int, n: int) -> List[list]:
+    rng: random.Random = random.Random(depth)
+    updates: List[list] = []
+    for _ in range(n):
+        offset: float = TICK * rng.randint(1, depth)
+        volume: str = '0' if rng.random() < 0.3 else f'{rng.random():.4f}'
+        if rng.random() < 0.5:
+            updates.append([0, {'b': [[f'{MID - offset:.1f}', volume, '0']]}, f'book-{depth}', 'XBT/USD'])
+        else:
+            updates.append([0, {'a': [[f'{MID + offset:.1f}', volume, '0']]}, f'book-{depth}', 'XBT/USD'])
+    return updates
+
+
+def run() -> None:
+    for depth in DEPTHS:
+        snapshot: BookSnapshot = _snapshot(depth)
+        book: Book = Book(snapshot)
+        snapshot.clean()
+        updates: List[list] = _updates(depth, N_UPDATES)
+
+        start: int = time.perf_counter_ns()
+        for update in updates:
+            book_update: BookUpdate = bookUpdatePool.acquire().init(*update)
+            book.update(book_update)
+            bookUpdatePool.release(book_update)
+        elapsed: int = time.perf_counter_ns() - start
+
+        best_bid: Quote = book.best_bid()
+        best_ask: Quote = book.best_ask()
+        print(
+            f'book-{depth:<5} {elapsed / N_UPDATES:8.1f} ns/update '
+            f'levels={len(book.bids)}/{len(book.asks)} bbo={best_bid.price}/{best_ask.price}'
+        )
+        book.clear()
+
+
+if __name__ == '__main__':
+    run()
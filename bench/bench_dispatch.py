@@ -0,0 +1,100 @@
+"""
+dispatch cost per channel message in KrakAppBase, excluding json decoding
+    - run from the repository root: python -m bench.bench_dispatch
+    - 'by name' is the string comparison chain on the channel name that on_message used to run,
+      'by channel' is the channelID table built from subscriptionStatus acknowledgements, book channels
+      point at on_book once their snapshot has been dispatched
+"""
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, List
+
+from kraken.krak_app_base import KrakAppBase
+
+N_MESSAGES: int = 200_000
+ROUNDS: int = 5
+
+FRAMES: List[List[Any]] = [
+    [336, {'a': [['20000.10000', '0.50000000', '1671000000.000000']]}, 'book-10', 'XBT/USD'],
+    [336, {'b': [['19999.90000', '0.10000000', '1671000000.000000']]}, 'book-10', 'XBT/USD'],
+    [337, [['20000.00000', '0.01000000', '1671000000.000000', 'b', 'l', '']], 'trade', 'XBT/USD'],
+    [[{'OUF4EM-FRGI2-MQMWZD': {'status': 'open'}}], 'openOrders', {'sequence': 1}]
+]
+
+STATUSES: List[dict] = [
+    {'channelID': 336, 'channelName': 'book-10', 'event': 'subscriptionStatus', 'status': 'subscribed'},
+    {'channelID': 337, 'channelName': 'trade', 'event': 'subscriptionStatus', 'status': 'subscribed'}
+]
+
+SNAPSHOT: List[Any] = [
+    336,
+    {
+        'as': [['20000.10000', '0.50000000', '1671000000.000000']],
+        'bs': [['19999.90000', '0.10000000', '1671000000.000000']]
+    },
+    'book-10',
+    'XBT/USD'
+]
+
+
+class NoopApp(KrakAppBase):
+    async def on_book(self, book: list) -> None: ...
+    async def on_book_snapshot(self, snapshot: list) -> None: ...
+    async def on_trade_(self, trade: list) -> None: ...
+    async def on_open_orders(self, orders: list) -> None: ...
+    async def on_own_trades(self, trades: list) -> None: ...
+
+
+async def dispatch_by_name(app: NoopApp, js_list: List[Any]) -> None:
+    md_update: str = js_list[-2]
+    order_update: str = js_list[1]
+    if md_update in ('book-10', 'book-25', 'book-100', 'book-500', 'book-1000'):
+        if 'a' in js_list[1] or 'b' in js_list[1]:
+            await app.on_book(js_list)
+        else:
+            await app.on_book_snapshot(js_list)
+    elif md_update == 'trade':
+        await app.on_trade_(js_list)
+    elif md_update == 'spread':
+        await app.on_spread_(js_list)
+    elif md_update in ('ohlc-1', 'ohlc-5', 'ohlc-15', 'ohlc-30', 'ohlc-60'):
+        await app.on_ohlc_(js_list)
+    elif md_update == 'ticker':
+        await app.on_ticker_(js_list)
+    elif order_update == 'openOrders':
+        await app.on_open_orders(js_list)
+    elif order_update == 'ownTrades':
+        await app.on_own_trades(js_list)
+
+
+async def _time(dispatch: Callable[[List[Any]], Awaitable[None]], frames: List[List[Any]]) -> float:
+    start: int = time.perf_counter_ns()
+    for frame in frames:
+        await dispatch(frame)
+    return (time.perf_counter_ns() - start) / len(frames)
+
+
+async def run() -> None:
+    app: NoopApp = NoopApp()
+    frames: List[List[Any]] = FRAMES * (N_MESSAGES // len(FRAMES))
+
+    for status in STATUSES:
+        app._on_channel_status(status)
+    await app._on_channel_message(SNAPSHOT)
+
+    async def by_name_dispatch(js_list: List[Any]) -> None:
+        await dispatch_by_name(app, js_list)
+
+    # alternate the two dispatchers and keep the best round of each, single runs vary by +-20% on a busy host
+    by_name: List[float] = []
+    by_channel: List[float] = []
+    for _ in range(ROUNDS):
+        by_name.append(await _time(by_name_dispatch, frames))
+        by_channel.append(await _time(app._on_channel_message, frames))
+
+    print(f'by name     {min(by_name):8.1f} ns/message')
+    print(f'by channel  {min(by_channel):8.1f} ns/message')
+
+
+if __name__ == '__main__':
+    asyncio.run(run())
@@ -0,0 +1,98 @@
+"""
+replays a kraken frame stream through KrakTrader under each available event loop backend
+    - run from the repository root: python -m bench.bench_loop [recording]
+    - recording: text file with one raw kraken frame per line (subscriptionStatus and book snapshot first),
+      a synthetic XBT/USD book-10 and trade stream is generated when omitted
+    - frames are served from a local websocket so the read loop, socket I/O and KrakTrader.on_message
+      all run on the loop under test
+"""
+import sys
+import json
+import time
+import random
+import asyncio
+from typing import List
+
+import websockets
+
+from app import KrakTrader
+from common import new_event_loop
+from common.event_loop import uvloop
+
+N_FRAMES: int = 100_000
+HOST: str = '127.0.0.1'
+PORT: int = 8899
+
+
+def _synthetic(n: int) -> List[str]:
+    rng: random.Random = random.Random(0)
+    now: float = time.time()
+    frames: List[str] = [
+        json.dumps({
+            'channelID': 336, 'channelName': 'book-10', 'event': 'subscriptionStatus',
+            'pair': 'XBT/USD', 'status': 'subscribed', 'subscription': {'depth': 10, 'name': 'book'}
+        }),
+        json.dumps([
+            336,
+            {
+                'as': [[f'{20000.1 + x * 0.1:.5f}', '1.00000000', f'{now:.6f}'] for x in range(10)],
+                'bs': [[f'{20000.0 - x * 0.1:.5f}', '1.00000000', f'{now:.6f}'] for x in range(10)]
+            },
+            'book-10',
+            'XBT/USD'
+        ])
+    ]
+    for _ in range(n):
+        if rng.random() < 0.1:
+            frames.append(json.dumps([
+                337, [['20000.00000', f'{rng.random():.8f}', f'{now:.6f}', 'b', 'l', '']], 'trade', 'XBT/USD'
+            ]))
+        else:
+            side: str = 'a' if rng.random() < 0.5 else 'b'
+            price: float = 20000.1 + rng.randint(0, 9) * 0.1 if side == 'a' else 20000.0 - rng.randint(0, 9) * 0.1
+            volume: str = '0.00000000' if rng.random() < 0.2 else f'{rng.random():.8f}'
+            frames.append(json.dumps([336, {side: [[f'{price:.5f}', volume, f'{now:.6f}']]}, 'book-10', 'XBT/USD']))
+    return frames
+
+
+async def _replay(frames: List[str]) -> str:
+    async def serve(websocket, path):
+        for frame in frames:
+            await websocket.send(frame)
+        await websocket.close()
+
+    server = await websockets.serve(serve, HOST, PORT)  # type: ignore[attr-defined]
+    app: KrakTrader = KrakTrader('XBT/USD', f'ws://{HOST}:{PORT}', '', '', '', '')
+    app.enable_latency_monitor()
+    if app._websocket_public:
+        app._websocket_public._reconnect = False
+
+    start: int = time.perf_counter_ns()
+    await app.start()
+    elapsed: int = time.perf_counter_ns() - start
+
+    server.close()
+    await server.wait_closed()
+
+    book: dict = app.latency.handler['book-10'].summary() if app.latency else {}
+    return f'{len(frames) / elapsed * 1e9:10.0f} msgs/sec  book-10 handler p50={book["p50_us"]:.1f}us ' \
+           f'p99={book["p99_us"]:.1f}us p99.9={book["p99.9_us"]:.1f}us'
+
+
+def run() -> None:
+    if len(sys.argv) > 1:
+        with open(sys.argv[1]) as f:
+            frames: List[str] = [line.rstrip('\n') for line in f if line.strip()]
+    else:
+        frames = _synthetic(N_FRAMES)
+
+    backends: List[str] = ['asyncio', 'uvloop'] if uvloop else ['asyncio']
+    for backend in backends:
+        loop = new_event_loop(backend)
+        result: str = loop.run_until_complete(_replay(frames))
+        loop.close()
+        print(f'{backend:<8} {result}')
+
+
+if __name__ == '__main__':
+    run()
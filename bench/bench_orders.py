@@ -0,0 +1,82 @@
+"""
+encode cost of addOrder, editOrder and cancelOrder frames, pre-rendered templates against a dict run through the codec
+    - run from the repository root: python -m bench.bench_orders
+    - 'dict' is the frame KrakApp used to build on every send, 'template' is kraken.order_encoder.OrderEncoder
+"""
+import time
+from typing import Callable, Type
+
+from common import JsonCodec, Order, Side, get_codec
+from kraken.order_encoder import OrderEncoder
+from kraken.symbol_config import SymbolConfigMap
+
+N_ORDERS: int = 200_000
+TOKEN: str = 'WW91ciBhdXRoZW50aWNhdGlvbiB0b2tlbiBnb2VzIGhlcmUu'
+
+ORDER: Order = Order('XBT/USD', Side.BUY, 0, 0.0001, 20000.1, 'limit', 'pendingNew', 'GTC')
+ORDER.order_id = 'OUF4EM-FRGI2-MQMWZD'
+
+
+def dict_new_order(codec: Type[JsonCodec], order: Order, req_id: int) -> str:
+    return codec.dumps({
+        'pair': order.symbol,
+        'type': 'buy' if order.side == Side.BUY else 'sell',
+        'token': TOKEN,
+        'volume': SymbolConfigMap[order.symbol].format_volume(order.qty),
+        'price': SymbolConfigMap[order.symbol].format_price(order.price),
+        'ordertype': order.order_type,
+        'event': 'addOrder',
+        'timeinforce': 'GTC',
+        'reqid': req_id
+    })
+
+
+def dict_replace_order(codec: Type[JsonCodec], order: Order, req_id: int) -> str:
+    return codec.dumps({
+        'pair': order.symbol,
+        'event': 'editOrder',
+        'token': TOKEN,
+        'orderid': order.order_id,
+        'price': SymbolConfigMap[order.symbol].format_price(order.price + 1),
+        'volume': SymbolConfigMap[order.symbol].format_volume(order.qty),
+        'reqid': req_id
+    })
+
+
+def dict_cancel_order(codec: Type[JsonCodec], order: Order, req_id: int) -> str:
+    return codec.dumps({
+        'event': 'cancelOrder',
+        'token': TOKEN,
+        'txid': [order.order_id],
+        'reqid': req_id
+    })
+
+
+def _measure(name: str, encode: Callable[[int], str]) -> None:
+    start: int = time.perf_counter_ns()
+    for req_id in range(N_ORDERS):
+        encode(req_id)
+    elapsed: int = time.perf_counter_ns() - start
+    print(f'{name:<28} {elapsed / N_ORDERS:8.1f} ns/frame')
+
+
+def run() -> None:
+    codec: Type[JsonCodec] = get_codec()
+    encoder: OrderEncoder = OrderEncoder()
+
+    assert codec.loads(encoder.new_order(TOKEN, ORDER, 1)) == codec.loads(dict_new_order(codec, ORDER, 1))
+    assert codec.loads(encoder.replace_order(TOKEN, ORDER, ORDER.price + 1, ORDER.qty, 1)) == \
+        codec.loads(dict_replace_order(codec, ORDER, 1))
+    assert codec.loads(encoder.cancel_order(TOKEN, ORDER, 1)) == codec.loads(dict_cancel_order(codec, ORDER, 1))
+
+    _measure(f'addOrder dict ({codec.name})', lambda req_id: dict_new_order(codec, ORDER, req_id))
+    _measure('addOrder template', lambda req_id: encoder.new_order(TOKEN, ORDER, req_id))
+    _measure(f'editOrder dict ({codec.name})', lambda req_id: dict_replace_order(codec, ORDER, req_id))
+    _measure('editOrder template',
+             lambda req_id: encoder.replace_order(TOKEN, ORDER, ORDER.price + 1, ORDER.qty, req_id))
+    _measure(f'cancelOrder dict ({codec.name})', lambda req_id: dict_cancel_order(codec, ORDER, req_id))
+    _measure('cancelOrder template', lambda req_id: encoder.cancel_order(TOKEN, ORDER, req_id))
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,55 @@
+"""
+memory and construction cost of 1M quotes, slotted common.Quote against the previous InitVar dataclass
+    - run from the repository root: python -m bench.bench_types
+"""
+import gc
+import time
+import tracemalloc
+from dataclasses import dataclass, field, InitVar
+from typing import Callable, List
+
+from common import Quote
+
+N_QUOTES: int = 1_000_000
+
+
+@dataclass
+class DictQuote:
+    _price: InitVar[float]
+    _volume: InitVar[float]
+    _timestamp: InitVar[float]
+
+    price: float = field(init=False)
+    volume: float = field(init=False)
+    timestamp: float = field(init=False)
+
+    def __post_init__(self, _price, _volume, _timestamp):
+        self.price = float(_price)
+        self.volume = float(_volume)
+        self.timestamp = float(_timestamp)
+
+
+def _measure(name: str, factory: Callable) -> None:
+    gc.collect()
+    start: int = time.perf_counter_ns()
+    quotes: List = [factory('20000.10000', '0.50000000', '1671000000.000000') for _ in range(N_QUOTES)]
+    elapsed: int = time.perf_counter_ns() - start
+    del quotes
+
+    gc.collect()
+    tracemalloc.start()
+    quotes = [factory('20000.10000', '0.50000000', '1671000000.000000') for _ in range(N_QUOTES)]
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del quotes
+
+    print(f'{name:<12} {elapsed / N_QUOTES:8.1f} ns/quote {size / N_QUOTES:8.1f} bytes/quote')
+
+
+def run() -> None:
+    _measure('dataclass', DictQuote)
+    _measure('slots', Quote)
+
+
+if __name__ == '__main__':
+    run()
@@ -0,0 +1,81 @@
+"""
+cost of 100k order lifecycles (new, ack, replace, partial fill, cancel) through common.WorkingOrderBook
+    - run from the repository root: python -m bench.bench_workingorders
+    - lifecycles are timed in blocks, a flat ns/lifecycle from the first to the last block means nothing
+      grows with the number of orders seen (the canceled order history used to be an unbounded list)
+    - orders are kept working 100 at a time so the price level and per side queries have something to index
+"""
+import sys
+import time
+import logging
+from typing import List
+
+from common import Fill, Order, Side, WorkingOrderBook
+
+N_LIFECYCLES: int = 100_000
+N_BLOCKS: int = 10
+N_WORKING: int = 100
+
+
+def _order(i: int) -> Order:
+    return Order(
+        'XBT/USD',
+        Side.BUY if i % 2 else Side.SELL,
+        -sys.maxsize,
+        0.002,
+        20000 + (i % 50) * 0.1,
+        'limit',
+        'pendingNew',
+        'GTC'
+    )
+
+
+def run() -> None:
+    logging.disable(logging.WARNING)
+    book: WorkingOrderBook = WorkingOrderBook()
+    working: List[Order] = []
+    clorder_id: int = 0
+    block_size: int = N_LIFECYCLES // N_BLOCKS
+    block_ns: List[int] = []
+
+    for block in range(N_BLOCKS):
+        start: int = time.perf_counter_ns()
+        for i in range(block * block_size, (block + 1) * block_size):
+            clorder_id += 1
+            order: Order = _order(i)
+            order.clorder_id = clorder_id
+            book.on_pending(order)
+            book.new_order_ack(f'O{i}', clorder_id)
+
+            clorder_id += 1
+            replace: Order = Order(order.symbol, order.side, clorder_id, order.qty, order.price + 0.1,
+                                   order.order_type, 'editOrder', order.time_in_force)
+            replace.order_id = order.order_id
+            book.on_pending(replace)
+            book.replace_order_ack(f'R{i}', clorder_id)
+
+            book.fill(Fill(f'R{i}', order.side, 0.001, order.symbol, order.price, 0))
+            book.orders_at_price(order.side, order.price)
+            book.working_qty(order.side)
+
+            working.append(order)
+            if len(working) > N_WORKING:
+                oldest: Order = working.pop(0)
+                clorder_id += 1
+                cancel: Order = Order(oldest.symbol, oldest.side, clorder_id, oldest.qty, oldest.price,
+                                      oldest.order_type, 'cancelOrder', oldest.time_in_force)
+                cancel.order_id = oldest.order_id
+                book.on_pending(cancel)
+                book.cancel_order_ack(clorder_id)
+                book.on_open_order_cancel(oldest.order_id)  # type: ignore
+        block_ns.append(time.perf_counter_ns() - start)
+
+    for block, elapsed in enumerate(block_ns):
+        print(f'lifecycles {block * block_size:>6}-{(block + 1) * block_size:<6} '
+              f'{elapsed / block_size:8.1f} ns/lifecycle')
+    print(f'working {len(book.orders)} '
+          f'buy qty {book.working_qty(Side.BUY):.4f} sell qty {book.working_qty(Side.SELL):.4f}')
+
+
+if __name__ == '__main__':
+    run()
@@ -2,6 +2,11 @@ from .types import *
 from .pools import *
 from .finmath import FinMath
 from .logger import get_logger
+from .codec import JsonCodec, get_codec
+from .latency import LatencyHistogram, LatencyMonitor
+from .event_loop import new_event_loop
+from .rest_client import RestClient
+from .throttler import OrderRateLimiter, RateCounter, RATE_LIMIT_ERROR
 from .position_manager import PositionManager
 from .workingorderbook import WorkingOrderBook
 from .websocket_client import WebsocketClient, WebsocketHandler
@@ -0,0 +1,59 @@
+import json
+from typing import Any, Dict, Optional, Type, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+from .logger import get_logger
+
+
+class JsonCodec:
+    """
+    stdlib json codec
+        - loads accepts the websocket frame as received (str or bytes), no intermediate copy is needed
+        - dumps returns str so frames are sent as websocket text frames
+    """
+    name: str = 'json'
+
+    @staticmethod
+    def loads(data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any) -> str:
+        return json.dumps(obj)
+
+
+class OrjsonCodec(JsonCodec):
+    """
+    orjson codec, used when orjson is installed
+    """
+    name: str = 'orjson'
+
+    @staticmethod
+    def loads(data: Union[str, bytes]) -> Any:
+        return orjson.loads(data)
+
+    @staticmethod
+    def dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+
+
+CODECS: Dict[str, Type[JsonCodec]] = {
+    JsonCodec.name: JsonCodec,
+    OrjsonCodec.name: OrjsonCodec
+}
+
+
+def get_codec(name: Optional[str] = None) -> Type[JsonCodec]:
+    """
+    :param name: json or orjson, defaults to the fastest codec available
+    """
+    if name is None:
+        name = OrjsonCodec.name if orjson else JsonCodec.name
+    if name == OrjsonCodec.name and not orjson:
+        get_logger(__name__).warning('orjson is not installed, falling back to json')
+        name = JsonCodec.name
+    return CODECS[name]
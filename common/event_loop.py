@@ -0,0 +1,30 @@
+import asyncio
+from typing import Optional
+
+from .logger import get_logger
+
+try:
+    import uvloop  # type: ignore
+except ImportError:
+    uvloop = None  # type: ignore
+
+LOOP_BACKENDS = ('uvloop', 'asyncio')
+
+
+def new_event_loop(backend: Optional[str] = None) -> asyncio.AbstractEventLoop:
+    """
+    :param backend: uvloop or asyncio, defaults to uvloop when it is installed
+    """
+    logger = get_logger(__name__)
+    if backend is None:
+        backend = 'uvloop' if uvloop else 'asyncio'
+
+    if backend == 'uvloop' and not uvloop:
+        logger.warning('uvloop is not installed, falling back to asyncio')
+        backend = 'asyncio'
+    elif backend not in LOOP_BACKENDS:
+        raise ValueError(f'unknown event loop backend {backend}, expected one of {LOOP_BACKENDS}')
+
+    loop: asyncio.AbstractEventLoop = uvloop.new_event_loop() if backend == 'uvloop' else asyncio.new_event_loop()
+    logger.info(f'event loop backend -> {backend} ({type(loop).__module__}.{type(loop).__name__})')
+    return loop
@@ -0,0 +1,144 @@
+import time
+import asyncio
+from typing import Dict, List, Optional
+
+from .logger import get_logger
+
+SUB_BUCKET_BITS: int = 5
+SUB_BUCKETS: int = 1 << SUB_BUCKET_BITS
+
+
+class LatencyHistogram:
+    """
+    HDR style log-linear histogram of nanosecond values
+        - values below 2^SUB_BUCKET_BITS are counted exactly, above that every power of two is split into
+          SUB_BUCKETS linear buckets, so any reported value is within ~3% of the recorded value
+        - recording is O(1): one bit_length, one shift and a dict increment
+    """
+    def __init__(self) -> None:
+        self.counts: Dict[int, int] = {}
+        self.count: int = 0
+        self.total: int = 0
+        self.min: int = 0
+        self.max: int = 0
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < SUB_BUCKETS:
+            return value
+        shift: int = value.bit_length() - SUB_BUCKET_BITS - 1
+        return ((shift + 1) << SUB_BUCKET_BITS) + (value >> shift) - SUB_BUCKETS
+
+    @staticmethod
+    def _value(index: int) -> int:
+        """
+        highest value counted in the bucket at index
+        """
+        if index < SUB_BUCKETS:
+            return index
+        shift: int = (index >> SUB_BUCKET_BITS) - 1
+        return (((index & (SUB_BUCKETS - 1)) + SUB_BUCKETS + 1) << shift) - 1
+
+    def record(self, value: int) -> None:
+        if value < 0:
+            value = 0
+        index: int = self._index(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        if not self.count or value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.count += 1
+        self.total += value
+
+    def percentile(self, percentile: float) -> int:
+        if not self.count:
+            return 0
+        target: float = self.count * percentile / 100
+        seen: int = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._value(index), self.max)
+        return self.max
+
+    def reset(self) -> None:
+        self.counts.clear()
+        self.count = 0
+        self.total = 0
+        self.min = 0
+        self.max = 0
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            'count': self.count,
+            'mean_us': self.total / self.count / 1000 if self.count else 0,
+            'p50_us': self.percentile(50) / 1000,
+            'p99_us': self.percentile(99) / 1000,
+            'p99.9_us': self.percentile(99.9) / 1000,
+            'max_us': self.max / 1000
+        }
+
+
+class LatencyMonitor:
+    """
+    per message type latency histograms
+        - handler: local receive time (perf_counter_ns stamped by the websocket reader) to handler completion
+        - exchange: kraken message timestamp to local receive time, this includes any clock offset between
+          kraken and this host
+    """
+    def __init__(self) -> None:
+        self.handler: Dict[str, LatencyHistogram] = {}
+        self.exchange: Dict[str, LatencyHistogram] = {}
+        # perf_counter_ns has no epoch, keep the offset to convert receive stamps to wall clock time
+        self._wall_offset_ns: int = time.time_ns() - time.perf_counter_ns()
+        self._logger = get_logger(f'{__name__}.latency')
+
+    def on_handled(self, message_type: str, receive_ns: int) -> None:
+        if not receive_ns:
+            return
+        histogram: Optional[LatencyHistogram] = self.handler.get(message_type)
+        if histogram is None:
+            histogram = self.handler[message_type] = LatencyHistogram()
+        histogram.record(time.perf_counter_ns() - receive_ns)
+
+    def on_exchange_time(self, message_type: str, receive_ns: int, exchange_time: float) -> None:
+        """
+        :param exchange_time: kraken timestamp in seconds since epoch, eg. Quote.timestamp or Trade.time
+        """
+        if not receive_ns or exchange_time <= 0:
+            return
+        histogram: Optional[LatencyHistogram] = self.exchange.get(message_type)
+        if histogram is None:
+            histogram = self.exchange[message_type] = LatencyHistogram()
+        histogram.record(receive_ns + self._wall_offset_ns - int(exchange_time * 1_000_000_000))
+
+    def dump(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        return {
+            'handler': {name: h.summary() for name, h in self.handler.items()},
+            'exchange': {name: h.summary() for name, h in self.exchange.items()}
+        }
+
+    def reset(self) -> None:
+        for histogram in list(self.handler.values()) + list(self.exchange.values()):
+            histogram.reset()
+
+    def log(self) -> None:
+        lines: List[str] = []
+        for kind, histograms in self.dump().items():
+            for name, summary in histograms.items():
+                lines.append(
+                    f'{kind:<8} {name:<18} n={summary["count"]:<8} p50={summary["p50_us"]:.1f}us '
+                    f'p99={summary["p99_us"]:.1f}us p99.9={summary["p99.9_us"]:.1f}us max={summary["max_us"]:.1f}us'
+                )
+        self._logger.info('latency\n' + '\n'.join(lines))
+
+    async def export(self, interval: float, reset: bool = True) -> None:
+        """
+        logs the histograms every interval seconds, optionally starting a fresh window each time
+        """
+        while True:
+            await asyncio.sleep(interval)
+            self.log()
+            if reset:
+                self.reset()
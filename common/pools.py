@@ -1,10 +1,13 @@
-import queue
+import gc
 from abc import ABC, abstractmethod
+from typing import Callable, Generic, List, TypeVar
 
 from .logger import get_logger
 
 
 class PooledObject(ABC):
+    __slots__ = ()
+
     @staticmethod
     @abstractmethod
     def create_empty(*args) -> object: ...
@@ -14,55 +17,53 @@ class PooledObject(ABC):
     def init(self, *args) -> object: ...
 
 
-class Pool(object):
-    instance = None
+T = TypeVar('T', bound=PooledObject)
+
 
-    def __new__(cls, size, create_empty_fn):
-        if not cls.instance:
-            cls.instance = super(Pool, cls).__new__(cls)
-            cls._pool: queue.Queue[PooledObject] = queue.Queue(size)
-            cls.acquired_size = size
-            cls.size = size
-            cls.create_empty = create_empty_fn
-            cls._logger = get_logger(cls.__name__)
+class Pool(Generic[T]):
+    """
+    free list of pre-allocated objects of one type
+        - every pool is independent, create one pool per type
+        - no locking: pools are only used from the event loop thread
+        - when the free list runs dry the pool doubles in size
+        - objects are cleaned on release, callers must not keep references to released objects
+    """
+    def __init__(self, size: int, create_empty_fn: Callable[[], T]):
+        self.size = size
+        self.create_empty = create_empty_fn
+        self._free: List[T] = [create_empty_fn() for _ in range(size)]
 
-            for x in range(size):
-                cls._pool.put(
-                    create_empty_fn()
-                )
-        return cls.instance
+        #
+        self.hits: int = 0
+        self.misses: int = 0
+        self.resizes: int = 0
+        self._logger = get_logger(f'{__name__}.pool')
 
-    def get_stats(self):
+    def get_stats(self) -> dict:
         return {
             'size': self.size,
-            'acquired_size': self.acquired_size,
+            'available': len(self._free),
+            'hits': self.hits,
+            'misses': self.misses,
+            'resizes': self.resizes,
             'gc.get_stats': gc.get_stats()
         }
 
-    def resize(self):
+    def resize(self) -> None:
         new_size: int = self.size * 2
         self._logger.info(f'resizing buffer from {self.size} to {new_size}')
-        new_queue: queue.Queue[PooledObject] = queue.Queue(new_size)
-        while not new_queue.full():
-            if not self._pool.empty():
-                new_queue.put(
-                    self._pool.get()
-                )
-            else:
-                new_queue.put(
-                    self.create_empty()
-                )
-        self.acquired_size = self.size
-        self._pool = new_queue
+        self._free.extend([self.create_empty() for _ in range(new_size - self.size)])
         self.size = new_size
+        self.resizes += 1
 
-    def acquire(self) -> PooledObject:
-        self.acquired_size -= 1
-        if self.acquired_size < 0:
+    def acquire(self) -> T:
+        if self._free:
+            self.hits += 1
+        else:
+            self.misses += 1
             self.resize()
-        return self._pool.get()
+        return self._free.pop()
 
-    def release(self, obj: PooledObject) -> None:
+    def release(self, obj: T) -> None:
         obj.clean()
-        self.acquired_size += 1
-        self._pool.put(obj)
+        self._free.append(obj)
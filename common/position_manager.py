@@ -1,28 +1,61 @@
-from typing import Optional
+from dataclasses import replace
+from typing import Dict, Optional
 
 from . import Side, Fill, Position
 
+# quantities below this are treated as flat, fills are floats
+QTY_EPSILON: float = 1e-12
+
 
 class PositionManager:
+    """
+    positions per symbol, maintained incrementally: O(1) per fill and per mark
+        - avg_price is the average cost of the open position, fills that reduce, close or flip it realize pnl
+          against avg_price, a flipped position starts over at the fill price
+        - unrealized pnl is marked against the price given to mark (eg. the live Book mid)
+        - get_position returns the live position, snapshot returns copies that are safe to publish
+    """
     def __init__(self) -> None:
-        self.fills = []
-
-    def add_fill(self, fill: Fill):
-        self.fills.append(fill)
+        self._positions: Dict[str, Position] = {}
 
     def get_position(self, symbol: str) -> Position:
-        total_qty: float = 0
-        avg_price: Optional[float] = None
-        position: Position = Position(total_qty, symbol, None)
-        for fill in self.fills:
-            if fill.side == Side.SELL:
-                total_qty += fill.qty * -1
-            else:
-                total_qty += fill.qty
-            avg_price = total_qty * fill.price
-        if total_qty != 0:
-            position.avg_price = avg_price / total_qty
-            position.qty = total_qty
+        position: Optional[Position] = self._positions.get(symbol)
+        if position is None:
+            position = self._positions[symbol] = Position(0, symbol, None)
         return position
 
+    def add_fill(self, fill: Fill) -> Position:
+        position: Position = self.get_position(fill.symbol)
+        qty: float = fill.qty if fill.side == Side.BUY else -fill.qty
+        held: float = position.qty
+        if held == 0 or (held > 0) == (qty > 0):
+            position.avg_price = ((position.avg_price or 0) * abs(held) + fill.price * abs(qty)) / abs(held + qty)
+            position.qty = held + qty
+        else:
+            closed: float = min(abs(qty), abs(held)) if held > 0 else -min(abs(qty), abs(held))
+            # a long closes by selling above cost, a short by buying below it
+            position.realized_pnl += closed * (fill.price - position.avg_price)  # type: ignore
+            position.qty = held + qty
+            if abs(position.qty) < QTY_EPSILON:
+                position.qty = 0
+                position.avg_price = None
+            elif (position.qty > 0) != (held > 0):
+                position.avg_price = fill.price
+        self._mark(position)
+        return position
+
+    def mark(self, symbol: str, price: Optional[float]) -> None:
+        position: Optional[Position] = self._positions.get(symbol)
+        if position is not None and price is not None:
+            position.mark_price = price
+            self._mark(position)
+
+    @staticmethod
+    def _mark(position: Position) -> None:
+        if position.mark_price is None or position.avg_price is None:
+            position.unrealized_pnl = 0
+        else:
+            position.unrealized_pnl = (position.mark_price - position.avg_price) * position.qty
 
+    def snapshot(self) -> Dict[str, Position]:
+        return {symbol: replace(position) for symbol, position in self._positions.items()}
@@ -0,0 +1,66 @@
+import asyncio
+from functools import partial
+from typing import Any, Dict, Optional
+
+try:
+    import aiohttp  # type: ignore
+except ImportError:
+    aiohttp = None  # type: ignore
+
+from .logger import get_logger
+
+
+class RestClient:
+    """
+    keep-alive http client for the event loop
+        - with aiohttp installed every request goes through one ClientSession whose connector keeps up to
+          pool_size connections alive
+        - otherwise a requests.Session (its HTTPAdapter pools pool_size connections) is run in the default
+          executor, the event loop is not blocked either way
+        - responses are decoded as json
+    """
+    def __init__(self, base_url: str, pool_size: int = 8, timeout: float = 10):
+        self._base_url = base_url
+        self._pool_size = pool_size
+        self._timeout = timeout
+        self._session: Any = None
+        self.backend: str = 'aiohttp' if aiohttp else 'requests'
+        self._logger = get_logger(f'{__name__}.rest_client')
+
+    def _get_session(self) -> Any:
+        if self._session is None:
+            if aiohttp:
+                self._session = aiohttp.ClientSession(
+                    connector=aiohttp.TCPConnector(limit=self._pool_size, keepalive_timeout=30),
+                    timeout=aiohttp.ClientTimeout(total=self._timeout)
+                )
+            else:
+                from requests import Session
+                from requests.adapters import HTTPAdapter
+                self._session = Session()
+                self._session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size))
+                self._session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=self._pool_size))
+            self._logger.info(f'rest session -> {self._base_url} ({self.backend}, pool_size={self._pool_size})')
+        return self._session
+
+    async def get(self, uri: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        return await self._request('GET', uri, params=params)
+
+    async def post(self, uri: str, data: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> Any:
+        return await self._request('POST', uri, data=data, headers=headers)
+
+    async def _request(self, method: str, uri: str, **kwargs) -> Any:
+        session: Any = self._get_session()
+        if aiohttp:
+            async with session.request(method, self._base_url + uri, **kwargs) as response:
+                return await response.json(content_type=None)
+        request = partial(session.request, method, self._base_url + uri, timeout=self._timeout, **kwargs)
+        return (await asyncio.get_running_loop().run_in_executor(None, request)).json()
+
+    async def close(self) -> None:
+        if self._session is not None:
+            if aiohttp:
+                await self._session.close()
+            else:
+                self._session.close()
+            self._session = None
@@ -1,34 +1,152 @@
 import time
+import asyncio
+from collections import OrderedDict
 from typing import (
-    Any,
     Dict,
     Tuple,
-    Callable,
     Optional
 )
 
 from .logger import get_logger
 
+# tier -> (max counter, decay per second)
+RATE_LIMIT_TIERS: Dict[str, Tuple[float, float]] = {
+    'starter': (60, 1),
+    'intermediate': (125, 2.34),
+    'pro': (180, 3.75)
+}
 
-class Throttle:
-    def __init__(self, max_messages_per_sec: int):
-        self._cache: Dict[str, float] = {}
-        self._max_messages_per_sec = max_messages_per_sec
-        self._logger = get_logger(f'{__name__}.throttle')
+# (max order age in seconds, penalty), an order older than the last bracket costs nothing to edit or cancel
+EDIT_PENALTIES: Tuple[Tuple[float, int], ...] = ((5, 6), (10, 5), (15, 4), (45, 2), (90, 1))
+CANCEL_PENALTIES: Tuple[Tuple[float, int], ...] = ((5, 8), (10, 6), (15, 5), (45, 4), (90, 2), (300, 1))
 
-    def _fire(self, func: Callable, *args: Tuple[Any, ...]) -> None:
-        func(*args)
-        self._cache[func.__name__] = time.time()
+RATE_LIMIT_ERROR: str = 'EOrder:Rate limit exceeded (local)'
 
-    def apply(self, func: Callable, *args) -> None:
-        cached: Optional[float] = self._cache.get(func.__name__, None)
-        if not cached:
-            self._fire(func, args)
-        else:
-            elapsed: float = time.time() - cached
-            if elapsed > 1 / self._max_messages_per_sec:
-                self._fire(func, args)
-            else:
-                self._logger.warning(f'prevented {func.__name__} from running')
 
+class RateCounter:
+    """
+    kraken's per pair trading rate counter, every order action adds to it and it decays linearly over time
+    """
+    __slots__ = ('max_counter', 'decay', '_value', '_updated')
 
+    def __init__(self, max_counter: float, decay: float):
+        self.max_counter = max_counter
+        self.decay = decay
+        self._value: float = 0
+        self._updated: float = time.monotonic()
+
+    def value(self) -> float:
+        now: float = time.monotonic()
+        self._value = max(0.0, self._value - (now - self._updated) * self.decay)
+        self._updated = now
+        return self._value
+
+    def headroom(self) -> float:
+        return self.max_counter - self.value()
+
+    def wait_time(self, cost: float) -> float:
+        """
+        seconds until cost fits under max_counter
+        """
+        return max(0.0, (self.value() + cost - self.max_counter) / self.decay)
+
+    def add(self, cost: float) -> None:
+        self._value = self.value() + cost
+
+
+class OrderRateLimiter:
+    """
+    local model of kraken's order rate limits, checked before an order action is sent
+        - addOrder costs 1, editOrder 1 plus a penalty and cancelOrder a penalty, both penalties depend on the age
+          of the order being edited or cancelled (see EDIT_PENALTIES and CANCEL_PENALTIES)
+        - order ages are tracked from acks (and openOrders opentm), an order of unknown age is charged the
+          highest penalty
+        - an action that does not fit is queued until the counter has decayed enough (block=True, optionally
+          giving up after max_wait seconds) or rejected straight away (block=False)
+    """
+    def __init__(
+        self,
+        tier: str = 'starter',
+        block: bool = True,
+        max_wait: Optional[float] = None,
+        max_tracked_orders: int = 10000
+    ):
+        if tier not in RATE_LIMIT_TIERS:
+            raise ValueError(f'unknown rate limit tier {tier}, expected one of {tuple(RATE_LIMIT_TIERS)}')
+        self._max_counter, self._decay = RATE_LIMIT_TIERS[tier]
+        self._block = block
+        self._max_wait = max_wait
+        self._max_tracked_orders = max_tracked_orders
+        self._counters: Dict[str, RateCounter] = {}
+        self._placed: OrderedDict[str, float] = OrderedDict()
+        self.rejected: int = 0
+        self.delayed: int = 0
+        self._logger = get_logger(f'{__name__}.order_rate_limiter')
+
+    def _counter(self, symbol: str) -> RateCounter:
+        counter: Optional[RateCounter] = self._counters.get(symbol)
+        if counter is None:
+            counter = self._counters[symbol] = RateCounter(self._max_counter, self._decay)
+        return counter
+
+    def headroom(self, symbol: str) -> float:
+        return self._counter(symbol).headroom()
+
+    def order_age(self, order_id: Optional[str]) -> float:
+        placed: Optional[float] = self._placed.get(order_id) if order_id else None
+        return time.time() - placed if placed is not None else 0
+
+    @staticmethod
+    def _penalty(penalties: Tuple[Tuple[float, int], ...], age: float) -> int:
+        for max_age, penalty in penalties:
+            if age < max_age:
+                return penalty
+        return 0
+
+    def edit_cost(self, order_id: Optional[str]) -> float:
+        return 1 + self._penalty(EDIT_PENALTIES, self.order_age(order_id))
+
+    def cancel_cost(self, order_id: Optional[str]) -> float:
+        return self._penalty(CANCEL_PENALTIES, self.order_age(order_id))
+
+    async def acquire(self, symbol: str, cost: float) -> bool:
+        """
+        :return: False if the action was rejected locally, it must not be sent
+        """
+        counter: RateCounter = self._counter(symbol)
+        waited: float = 0
+        while (wait := counter.wait_time(cost)) > 0:
+            if not self._block or (self._max_wait is not None and waited + wait > self._max_wait):
+                self.rejected += 1
+                self._logger.warning(
+                    f'{symbol} rate counter {counter.value():.2f}/{counter.max_counter}, rejecting cost {cost}'
+                )
+                return False
+            if not waited:
+                self.delayed += 1
+            waited += wait
+            await asyncio.sleep(wait)
+        counter.add(cost)
+        return True
+
+    def on_order_placed(self, order_id: str, placed: Optional[float] = None) -> None:
+        """
+        :param placed: seconds since epoch, defaults to now
+        """
+        self._placed[order_id] = time.time() if placed is None else placed
+        self._placed.move_to_end(order_id)
+        if len(self._placed) > self._max_tracked_orders:
+            self._placed.popitem(last=False)
+
+    def on_order_closed(self, order_id: Optional[str]) -> None:
+        if order_id:
+            self._placed.pop(order_id, None)
+
+    def get_stats(self) -> dict:
+        return {
+            'counters': {symbol: counter.value() for symbol, counter in self._counters.items()},
+            'max_counter': self._max_counter,
+            'tracked_orders': len(self._placed),
+            'delayed': self.delayed,
+            'rejected': self.rejected
+        }
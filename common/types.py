@@ -1,9 +1,9 @@
 import sys
 from enum import Enum
-from typing import Optional
-from dataclasses import dataclass, field, InitVar
+from typing import Final, Optional
+from dataclasses import dataclass
 
-from .pools import PooledObject
+from .pools import Pool, PooledObject
 
 
 class Side(Enum):
@@ -12,21 +12,17 @@ class Side(Enum):
     SELL = 2
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class Quote(PooledObject):
-    _price: InitVar[float]
-    _volume: InitVar[float]
-    _timestamp: InitVar[float]
-
-    price: float = field(init=False)
-    volume: float = field(init=False)
-    timestamp: float = field(init=False)
+    price: float
+    volume: float
+    timestamp: float
 
     @staticmethod
     def create_empty(*args):
         return Quote(-sys.maxsize, 0, -sys.maxsize)
 
-    def __post_init__(self, _price, _volume, _timestamp):
+    def __init__(self, _price, _volume, _timestamp):
         self.price = float(_price)
         self.volume = float(_volume)
         self.timestamp = float(_timestamp)
@@ -48,21 +44,15 @@ class Quote(PooledObject):
         self.timestamp = -sys.maxsize
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class Trade:
-    _price: InitVar[float]
-    _volume: InitVar[float]
-    _time: InitVar[float]
-    _side: InitVar[str]
-    _order_type: InitVar[str]
-
-    price: float = field(init=False)
-    volume: float = field(init=False)
-    time: float = field(init=False)
-    side: str = field(init=False)
-    order_type: str = field(init=False)
-
-    def __post_init__(self, _price, _volume, _time, _side, _order_type):
+    price: float
+    volume: float
+    time: float
+    side: str
+    order_type: str
+
+    def __init__(self, _price, _volume, _time, _side, _order_type):
         self.price = float(_price)
         self.volume = float(_volume)
         self.time = float(_time)
@@ -70,33 +60,34 @@ class Trade:
         self.order_type = _order_type
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class Order(PooledObject):
     symbol: str
     side: Side
     clorder_id: int
-
-    _qty: InitVar[float]
-    qty: float = field(init=False)
-
-    _price: InitVar[float]
-    price: float = field(init=False)
-
+    qty: float
+    price: float
     order_type: str
     order_status: str
     time_in_force: Optional[str]
 
-    order_id: Optional[str] = field(init=False)
-    orig_qty: float = field(init=False)
-    cum_qty: float = field(init=False)
+    order_id: Optional[str]
+    orig_qty: float
+    cum_qty: float
 
     @staticmethod
     def create_empty(*args):
         return Order('', Side.NONE, -sys.maxsize, 0, -sys.maxsize, '', '', None)
 
-    def __post_init__(self, _qty, _price):
+    def __init__(self, symbol, side, clorder_id, _qty, _price, order_type, order_status, time_in_force):
+        self.symbol = symbol
+        self.side = side
+        self.clorder_id = clorder_id
         self.qty = float(_qty)
         self.price = float(_price)
+        self.order_type = order_type
+        self.order_status = order_status
+        self.time_in_force = time_in_force
         self.order_id = None
         self.orig_qty = self.qty
         self.cum_qty = 0
@@ -128,7 +119,7 @@ class Order(PooledObject):
         self.cum_qty = 0
 
 
-@dataclass
+@dataclass(slots=True)
 class Fill(PooledObject):
     order_id: str
     side: Side
@@ -159,9 +150,14 @@ class Fill(PooledObject):
         self.time = -sys.maxsize
 
 
-@dataclass
+@dataclass(slots=True)
 class Position:
     qty: float
     symbol: str
     avg_price: Optional[float]
+    realized_pnl: float = 0
+    unrealized_pnl: float = 0
+    mark_price: Optional[float] = None
+
 
+quotePool: Final[Pool[Quote]] = Pool(1024, Quote.create_empty)
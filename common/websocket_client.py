@@ -1,33 +1,203 @@
-from typing import Optional
+import time
+import random
+import asyncio
+from typing import Awaitable, Optional, Union, List, Tuple
 from abc import abstractmethod
 from websockets.client import connect, WebSocketClientProtocol
+from websockets.exceptions import ConnectionClosed, WebSocketException
 
 from .logger import get_logger
 
 
 class WebsocketHandler:
     @abstractmethod
-    async def on_message(self, message: str) -> None:
+    async def on_message(self, message: Union[str, bytes], receive_ns: int = 0) -> None:
+        """
+        :param receive_ns: time.perf_counter_ns() when the frame was read off the socket
+        """
         ...
 
+    async def on_messages(self, messages: List[Union[str, bytes]], receive_ns: int = 0) -> None:
+        """
+        triggered by the queued reader with every frame that was pending when the processor caught up
+        :param receive_ns: time.perf_counter_ns() when the oldest frame was read off the socket
+        """
+        for message in messages:
+            await self.on_message(message, receive_ns)
+
+    async def on_disconnect(self, client: 'WebsocketClient') -> None:
+        """
+        triggered when the connection drops, before the client starts reconnecting
+        """
+
+    async def on_reconnect(self, client: 'WebsocketClient') -> bool:
+        """
+        triggered once the client is connected again, before reading resumes
+        :return: False if the session could not be restored (eg. a failed token refresh), the client then drops
+                 the connection and reconnects again with backoff
+        """
+        return True
+
 
 class WebsocketClient:
-    def __init__(self, url: str):
+    """
+    websocket read loop
+        - with reconnect enabled a dropped connection is retried with exponential backoff and jitter
+          (min_backoff * 2^attempt seconds capped at max_backoff, randomised between half and full delay)
+          when the handler cannot restore its session on the new connection (on_reconnect returns False)
+          the connection is dropped and retried at the next backoff step
+        - close() stops the client for good, it will not reconnect afterwards
+        - with a queue_size the socket is read by its own task: frames are timestamped and put on a bounded
+          queue, a processor task drains it and hands backlogs to the handler in one on_messages call.
+          if the handler raises, the processor closes the socket and read_til_close re-raises the error,
+          even when the reader is blocked on a full queue
+    """
+    def __init__(
+        self,
+        url: str,
+        reconnect: bool = False,
+        min_backoff: float = 0.5,
+        max_backoff: float = 30,
+        queue_size: int = 0
+    ):
         self._url = url
+        self._reconnect = reconnect
+        self._min_backoff = min_backoff
+        self._max_backoff = max_backoff
+        self._closing: bool = False
         self._websocket: Optional[WebSocketClientProtocol] = None
         self._logger = get_logger(__name__)
 
+        #
+        self._queue_size = queue_size
+        self._queue: Optional[asyncio.Queue[Tuple[int, Union[str, bytes]]]] = None
+        self.last_receive_ns: int = 0
+        self.frames: int = 0
+        self.batches: int = 0
+        self.max_queue_depth: int = 0
+
+    def get_stats(self) -> dict:
+        return {
+            'url': self._url,
+            'frames': self.frames,
+            'batches': self.batches,
+            'queue_depth': self._queue.qsize() if self._queue else 0,
+            'max_queue_depth': self.max_queue_depth
+        }
+
     async def read_til_close(self, handler: WebsocketHandler) -> None:
         if not self._websocket or self._websocket.close_code:
             await self.connect()
 
-        if self._websocket:
-            self._logger.info(f'starting read loop -> {self._url}')
+        processor: Optional[asyncio.Task] = None
+        if self._queue_size:
+            self._queue = asyncio.Queue(self._queue_size)
+            processor = asyncio.create_task(self._process(handler, self._queue))
+
+        try:
+            while self._websocket:
+                self._logger.info(f'starting read loop -> {self._url}')
+                try:
+                    async for message in self._websocket:
+                        self.last_receive_ns = time.perf_counter_ns()
+                        if self._queue is not None:
+                            if self._queue.full():
+                                await self._until_processor_stops(
+                                    self._queue.put((self.last_receive_ns, message)), processor  # type: ignore
+                                )
+                            else:
+                                self._queue.put_nowait((self.last_receive_ns, message))
+                        else:
+                            await handler.on_message(message, self.last_receive_ns)
+                except ConnectionClosed as e:
+                    self._logger.warning(f'connection closed -> {self._url}: {e}')
+
+                if self._closing or not self._reconnect:
+                    break
+
+                if processor:
+                    await self._until_processor_stops(self._queue.join(), processor)  # type: ignore
+                await handler.on_disconnect(self)
+                if not await self._restore(handler):
+                    break
+        finally:
+            await self.close()
+            if processor:
+                if processor.done():
+                    # surface handler errors raised in the processor task
+                    processor.result()
+                else:
+                    processor.cancel()
+
+    @staticmethod
+    async def _until_processor_stops(awaitable: Awaitable[None], processor: asyncio.Task) -> None:
+        """
+        awaits awaitable, if the processor task stops first the awaitable is cancelled and the processor's
+        exception raised
+        """
+        waiter: asyncio.Future = asyncio.ensure_future(awaitable)
+        await asyncio.wait((waiter, processor), return_when=asyncio.FIRST_COMPLETED)
+        if not waiter.done():
+            waiter.cancel()
+            processor.result()
+
+    async def _process(self, handler: WebsocketHandler, queue: asyncio.Queue) -> None:
+        while True:
+            receive_ns, message = await queue.get()
+            backlog: int = queue.qsize()
             try:
-                async for message in self._websocket:
-                    await handler.on_message(str(message))
-            finally:
+                if not backlog:
+                    self.frames += 1
+                    await handler.on_message(message, receive_ns)
+                else:
+                    messages: List[Union[str, bytes]] = [message]
+                    for _ in range(backlog):
+                        messages.append(queue.get_nowait()[1])
+                    self.frames += len(messages)
+                    self.batches += 1
+                    if len(messages) > self.max_queue_depth:
+                        self.max_queue_depth = len(messages)
+                    await handler.on_messages(messages, receive_ns)
+            except Exception:
+                self._logger.exception(f'handler failed, closing -> {self._url}')
                 await self.close()
+                raise
+            finally:
+                for _ in range(backlog + 1):
+                    queue.task_done()
+
+    async def _restore(self, handler: WebsocketHandler) -> bool:
+        """
+        reconnects until the handler restores its session on the new connection, each refusal adds a backoff step
+        :return: False if the client was closed before the session was restored
+        """
+        attempt: int = 0
+        while await self.reconnect(attempt):
+            if await handler.on_reconnect(self):
+                return True
+            self._logger.warning(f'session not restored, reconnecting -> {self._url}')
+            if self._websocket:
+                await self._websocket.close()
+            attempt += 1
+        return False
+
+    async def reconnect(self, attempt: int = 0) -> bool:
+        """
+        :param attempt: backoff step to start from
+        :return: False if the client was closed before it could reconnect
+        """
+        while not self._closing:
+            delay: float = min(self._max_backoff, self._min_backoff * 2 ** attempt)
+            delay = random.uniform(delay / 2, delay)
+            self._logger.info(f'reconnecting in {delay:.2f}s (attempt {attempt + 1}) -> {self._url}')
+            await asyncio.sleep(delay)
+            try:
+                await self.connect()
+                return True
+            except (OSError, asyncio.TimeoutError, WebSocketException) as e:
+                self._logger.warning(f'reconnect failed -> {self._url}: {e}')
+                attempt += 1
+        return False
 
     async def send(self, data: str) -> None:
         if self._websocket:
@@ -38,6 +208,6 @@ class WebsocketClient:
         self._websocket = await connect(self._url)
 
     async def close(self) -> None:
+        self._closing = True
         if self._websocket:
             await self._websocket.close()
-
@@ -1,43 +1,123 @@
 import sys
+from collections import OrderedDict
 from typing import (
-    List,
     Dict,
-    Union,
     Optional
 )
 
-from . import Order, Fill
+from . import Order, Fill, Side
 from .logger import get_logger
 
 
 class WorkingOrderBook:
-    def __init__(self) -> None:
+    """
+    working orders indexed for constant time lookups
+        - orders: working orders by order_id, pendings: order actions waiting for their ack by clorder_id,
+          open_pendings: orders reported pending on openOrders by order_id
+        - working orders are also indexed by the clorder_id they were acked under and by side and price level,
+          the clorder_id each order was indexed under is kept by order_id since KrakApp reassigns clorder_id on
+          the working order when it sends a replace or cancel
+          the working qty per side is maintained on every ack, fill, replace and removal
+        - canceled order_ids are remembered in a bounded set (the last max_canceled) so the second report of
+          a cancel (cancelOrderStatus and openOrders) is ignored without growing forever
+    """
+    def __init__(self, max_canceled: int = 10000) -> None:
         self.orders: Dict[str, Order] = {}
-        self.pendings: Dict[Union[int | str], Order] = {}
-        self._canceled_order_ids: List[str] = []
+        self.pendings: Dict[int, Order] = {}
+        self.open_pendings: Dict[str, Order] = {}
+        self._by_clorder_id: Dict[int, Order] = {}
+        self._indexed_clorder_ids: Dict[str, int] = {}
+        # kept per side in attributes rather than keyed by Side, Enum.__hash__ runs in python
+        self._buy_levels: Dict[float, Dict[str, Order]] = {}
+        self._sell_levels: Dict[float, Dict[str, Order]] = {}
+        self._buy_qty: float = 0
+        self._sell_qty: float = 0
+        self._max_canceled = max_canceled
+        self._canceled_order_ids: OrderedDict[str, None] = OrderedDict()
         self._logger = get_logger(f'{__name__}.working_orders')
 
-    def get_order(self, order_id: str):
+    def get_order(self, order_id: str) -> Optional[Order]:
         return self.orders.get(order_id)
 
+    def get_order_by_clorder_id(self, clorder_id: int) -> Optional[Order]:
+        return self._by_clorder_id.get(clorder_id)
+
+    def orders_at_price(self, side: Side, price: float) -> Dict[str, Order]:
+        """
+        :return: the working orders at the price level by order_id, do not modify
+        """
+        return (self._buy_levels if side is Side.BUY else self._sell_levels).get(price, {})
+
+    def working_qty(self, side: Side) -> float:
+        return self._buy_qty if side is Side.BUY else self._sell_qty
+
+    def _add_qty(self, side: Side, qty: float) -> None:
+        if side is Side.BUY:
+            self._buy_qty += qty
+        else:
+            self._sell_qty += qty
+
+    def is_canceled(self, order_id: str) -> bool:
+        return order_id in self._canceled_order_ids
+
+    def _add(self, order: Order) -> None:
+        order_id: str = order.order_id  # type: ignore
+        if order_id in self.orders:
+            self._remove(order_id)
+        self.orders[order_id] = order
+        if order.clorder_id != -sys.maxsize:
+            self._by_clorder_id[order.clorder_id] = order
+            self._indexed_clorder_ids[order_id] = order.clorder_id
+        levels: Dict[float, Dict[str, Order]] = self._buy_levels if order.side is Side.BUY else self._sell_levels
+        level: Optional[Dict[str, Order]] = levels.get(order.price)
+        if level is None:
+            level = levels[order.price] = {}
+        level[order_id] = order
+        self._add_qty(order.side, order.qty)
+
+    def _remove(self, order_id: str) -> Optional[Order]:
+        order: Optional[Order] = self.orders.pop(order_id, None)
+        if order is None:
+            return None
+        clorder_id: Optional[int] = self._indexed_clorder_ids.pop(order_id, None)
+        if clorder_id is not None and self._by_clorder_id.get(clorder_id) is order:
+            del self._by_clorder_id[clorder_id]
+        levels: Dict[float, Dict[str, Order]] = self._buy_levels if order.side is Side.BUY else self._sell_levels
+        level: Optional[Dict[str, Order]] = levels.get(order.price)
+        if level is not None:
+            level.pop(order_id, None)
+            if not level:
+                del levels[order.price]
+        self._add_qty(order.side, -order.qty)
+        return order
+
+    def _on_canceled(self, order_id: str) -> None:
+        self._canceled_order_ids[order_id] = None
+        if len(self._canceled_order_ids) > self._max_canceled:
+            self._canceled_order_ids.popitem(last=False)
+
     def on_open_order_pending(self, order: Order) -> None:
         if order.order_id:
-            self.pendings[order.order_id] = order
+            self.open_pendings[order.order_id] = order
         else:
             self._logger.warning(f'received pending order with None order_id {order}')
 
     def on_open_order_new(self, order_id: str):
-        order: Optional[Order] = self.pendings.pop(order_id, None)
+        order: Optional[Order] = self.open_pendings.pop(order_id, None)
         if order:
-            self.orders[order_id] = order
+            if order_id in self.orders:
+                # already working from the addOrder ack, keep the order that carries its clorder_id
+                return
+            self._add(order)
         else:
             self._logger.warning(f'open_order_new: failed to find pending order_id for {order_id}')
 
     def on_open_order_cancel(self, order_id: str):
         if order_id not in self._canceled_order_ids:
-            order: Optional[Order] = self.orders.pop(order_id, None)
+            self.open_pendings.pop(order_id, None)
+            order: Optional[Order] = self._remove(order_id)
             if order:
-                self._canceled_order_ids.append(order_id)
+                self._on_canceled(order_id)
             else:
                 self._logger.warning(f'open_order_cancel: failed to find order_id {order_id}')
 
@@ -62,7 +142,7 @@ class WorkingOrderBook:
         else:
             if order_id:
                 pending.order_id = order_id
-                self.orders[order_id] = pending
+                self._add(pending)
             else:
                 self._logger.warning(f'new_order_ack received pending with None order_id {pending}')
 
@@ -72,15 +152,16 @@ class WorkingOrderBook:
             self._logger.warning(f'pending order not found for {clorder_id}')
         else:
             if pending.order_id:
-                order: Optional[Order] = self.orders.get(pending.order_id, None)
+                order: Optional[Order] = self._remove(pending.order_id)
                 if not order:
                     self._logger.warning(f'failed to find replaced order {pending.order_id}')
                 else:
                     order.order_status = 'replaced'
-                    order.order_id = order_id
+                    order.order_id = order_id or pending.order_id
                     order.clorder_id = pending.clorder_id
                     order.qty = pending.qty
                     order.price = pending.price
+                    self._add(order)
             else:
                 self._logger.warning(f'replace_order_ack received pending with None order_id {pending}')
 
@@ -91,11 +172,11 @@ class WorkingOrderBook:
         else:
             if pending.order_id:
                 if pending.order_id not in self._canceled_order_ids:
-                    order: Optional[Order] = self.orders.pop(pending.order_id, None)
+                    order: Optional[Order] = self._remove(pending.order_id)
                     if not order:
                         self._logger.warning(f'failed to find canceled order {pending.order_id}')
                     else:
-                        self._canceled_order_ids.append(pending.order_id)
+                        self._on_canceled(pending.order_id)
             else:
                 self._logger.warning(f'cancel_order_ack received pending with None order_id {pending}')
 
@@ -105,8 +186,9 @@ class WorkingOrderBook:
             if order and order.order_id:
                 order.qty -= fill.qty
                 order.cum_qty += fill.qty
+                self._add_qty(order.side, -fill.qty)
                 if order.qty == 0:
-                    self.orders.pop(order.order_id)
+                    self._remove(order.order_id)
                 elif order.qty < 0:
                     self._logger.warning(f'fill order has < 0 qty {order.order_id}')
             else:
@@ -115,5 +197,12 @@ class WorkingOrderBook:
             self._logger.warning(f'received fill without an order id: {fill}')
 
     def cancel_all(self) -> None:
+        for order_id in self.orders:
+            self._on_canceled(order_id)
         self.orders.clear()
-
+        self._by_clorder_id.clear()
+        self._indexed_clorder_ids.clear()
+        self._buy_levels.clear()
+        self._sell_levels.clear()
+        self._buy_qty = 0
+        self._sell_qty = 0
@@ -1,7 +1,11 @@
+from .symbol_config import SymbolConfig, SymbolConfigMap
 from .krak_app import KrakApp
+from .krak_app_base import KrakenApiError
 from .messages import (
     CancelAllOrdersAfterStatus,
     SubscriptionStatus,
+    BatchCancelStatus,
+    BatchOrderStatus,
     CancelAllStatus,
     bookUpdatePool,
     TradePayload,
@@ -9,28 +13,10 @@ from .messages import (
     BookSnapshot,
     OrderStatus,
     BookUpdate,
+    Candle,
     Spread,
     Ticker,
     Ohlc
 )
 from .book import Book
 
-
-class SymbolConfig:
-    def __init__(self, name: str, ccy: str, tick_size: float, minimum_lot_size: float):
-        self.name = name
-        self.ccy = ccy
-        self.tick_size = tick_size
-        self.minimum_lot_size = minimum_lot_size
-
-
-SymbolConfigMap: dict = {
-    'XBT/USD': SymbolConfig('XBT/USD', 'USD', 0.1, 0.0001),
-    'ETH/USD': SymbolConfig('ETH/USD', 'USD', 0.01, 0.01),
-    'USDT/EUR': SymbolConfig('USDT/EUR', 'EUR', 0.0001, 0.0001),
-    'NANO/USD': SymbolConfig('NANO/USD', 'USD', 0.0001, 0.0001),
-    'ATOM/USD': SymbolConfig('ATOM/USD', 'USD', 0.0001, 0.01),
-    'DOT/USD': SymbolConfig('DOT/USD', 'USD', 0.0001, 0.01),
-    'EUR/USD': SymbolConfig('EUR/USD', 'USD', 0.0001, 0.0001)
-}
-
@@ -1,38 +1,195 @@
 import bisect
-from typing import List, Callable
+import zlib
+from typing import List, Dict, Union, Optional
 
 from . import (
+    SymbolConfig,
     BookUpdate,
     BookSnapshot
 )
 from common import (
     Quote,
+    quotePool,
     get_logger
 )
 
 
+DEFAULT_DEPTH: int = 10
+
+# levels per side covered by kraken's book checksum
+CHECKSUM_DEPTH: int = 10
+
+
+class BookSide:
+    """
+    one side of a price level book
+        - levels are stored in a dict keyed by signed price (negated for bids) for O(1) lookup
+        - a sorted list of the same keys gives the level order, best price first. a new or removed level is
+          located by bisection (O(log n)) but shifts the list tail (O(n) memmove), so adding and removing levels
+          grows slowly with depth while volume changes on existing levels stay O(1)
+        - quotes() is cached until a level is added or removed, volume changes update the cached quotes in place
+        - the side never holds more than depth levels
+        - in fixed point mode (symbol_config given) keys are integer ticks, so level equality is exact
+        - level quotes are owned by the book: incoming quotes are copied into quotes from the quote pool
+          and released when their level is removed
+    """
+    def __init__(self, is_bid: bool, depth: int, symbol_config: Optional[SymbolConfig] = None):
+        self.is_bid = is_bid
+        self.depth = depth
+        self._sign: int = -1 if is_bid else 1
+        self._ticks_per_unit: Optional[float] = 1 / symbol_config.tick_size if symbol_config else None
+        self._keys: List[Union[int, float]] = []
+        self._levels: Dict[Union[int, float], Quote] = {}
+        self._quotes: Optional[List[Quote]] = None
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def best(self) -> Quote:
+        return self._levels[self._keys[0]]
+
+    def get(self, price: float) -> Optional[Quote]:
+        return self._levels.get(self._key(price))
+
+    def quotes(self) -> List[Quote]:
+        """
+        :return: the levels, best first, do not modify
+        """
+        if self._quotes is None:
+            levels: Dict[Union[int, float], Quote] = self._levels
+            self._quotes = [levels[key] for key in self._keys]
+        return self._quotes
+
+    def _key(self, price: float) -> Union[int, float]:
+        if self._ticks_per_unit:
+            return self._sign * round(price * self._ticks_per_unit)
+        return self._sign * price
+
+    def update(self, quote: Quote) -> None:
+        key: Union[int, float] = self._key(quote.price)
+        level: Optional[Quote] = self._levels.get(key)
+        if level is not None:
+            # update volume on level
+            if quote.volume == 0:
+                del self._levels[key]
+                del self._keys[bisect.bisect_left(self._keys, key)]
+                self._quotes = None
+                quotePool.release(level)
+            else:
+                level.volume = quote.volume
+                level.timestamp = quote.timestamp
+            return
+
+        if quote.volume == 0:
+            return
+
+        # quote needs to be placed in book
+        index: int = bisect.bisect_left(self._keys, key)
+        if index >= self.depth:
+            return
+        self._keys.insert(index, key)
+        self._quotes = None
+        self._levels[key] = quotePool.acquire().init(quote.price, quote.volume, quote.timestamp)
+
+        if len(self._keys) > self.depth:
+            quotePool.release(self._levels.pop(self._keys.pop()))
+
+    def clear(self) -> None:
+        for level in self._levels.values():
+            quotePool.release(level)
+        self._levels.clear()
+        self._keys.clear()
+        self._quotes = None
+
+
 class Book:
     def __init__(
         self,
-        snapshot: BookSnapshot
+        snapshot: BookSnapshot,
+        depth: Optional[int] = None,
+        symbol_config: Optional[SymbolConfig] = None
     ):
+        """
+        :param snapshot: the book snapshot sent by kraken on subscription
+        :param depth: number of levels kept per side, defaults to the depth of the book channel
+        :param symbol_config: enables fixed point mode, levels are indexed by integer ticks of tick_size
+        """
         self.symbol = snapshot.pair
-        self.bids: List[Quote] = [bid for bid in snapshot.snapshot.bs if bid.volume != 0]
-        self.asks: List[Quote] = [ask for ask in snapshot.snapshot.as_ if ask.volume != 0]
+        self.depth: int = depth if depth else Book.depth_from_channel(snapshot.channelName)
+        self._bids: BookSide = BookSide(True, self.depth, symbol_config)
+        self._asks: BookSide = BookSide(False, self.depth, symbol_config)
+
+        for bid in snapshot.snapshot.bs:
+            self._bids.update(bid)
+        for ask in snapshot.snapshot.as_:
+            self._asks.update(ask)
 
         self._logger = get_logger(__name__)
 
+    @staticmethod
+    def depth_from_channel(channel_name: str) -> int:
+        """
+        book channels are named book-{depth}, eg. book-10, book-1000
+        """
+        _, _, depth = channel_name.partition('-')
+        return int(depth) if depth.isdigit() else DEFAULT_DEPTH
+
+    @property
+    def bids(self) -> List[Quote]:
+        """
+        :return: the bid levels, best first, cached between level changes, do not modify
+        """
+        return self._bids.quotes()
+
+    @property
+    def asks(self) -> List[Quote]:
+        """
+        :return: the ask levels, best first, cached between level changes, do not modify
+        """
+        return self._asks.quotes()
+
     def update(self, md_update: BookUpdate) -> None:
         for quote in md_update.b:
-            self._update_book(quote, self.bids, True)
+            self._bids.update(quote)
         for quote in md_update.a:
-            self._update_book(quote, self.asks, False)
+            self._asks.update(quote)
+
+    def clear(self) -> None:
+        """
+        releases every level back to the quote pool, the book is empty afterwards
+        """
+        self._bids.clear()
+        self._asks.clear()
+
+    def checksum(self, price_places: int, volume_places: int = 8) -> str:
+        """
+        kraken's book checksum, compare with BookUpdate.checksum after applying the update
+            - CRC32 of the top CHECKSUM_DEPTH asks (best first) then bids, each price and volume written with the
+              decimal places of the feed's strings, without the decimal point and leading zeros
+        :param price_places: decimal places of the pair's prices on the book channel
+        :param volume_places: decimal places of volumes on the book channel
+        :return: the unsigned CRC32 as a decimal string
+        """
+        data: List[str] = []
+        for side in (self._asks, self._bids):
+            for quote in side.quotes()[:CHECKSUM_DEPTH]:
+                data.append(f'{quote.price:.{price_places}f}'.replace('.', '').lstrip('0'))
+                data.append(f'{quote.volume:.{volume_places}f}'.replace('.', '').lstrip('0'))
+        return str(zlib.crc32(''.join(data).encode()))
 
     def best_bid(self) -> Quote:
-        return self.bids[0]
+        return self._bids.best()
 
     def best_ask(self) -> Quote:
-        return self.asks[0]
+        return self._asks.best()
+
+    def mid(self) -> Optional[float]:
+        """
+        :return: the mid price, None while either side is empty
+        """
+        if not len(self._bids) or not len(self._asks):
+            return None
+        return (self._bids.best().price + self._asks.best().price) / 2
 
     def __repr__(self) -> str:
         book: str = ''
@@ -41,25 +198,3 @@ class Book:
         for bid in self.bids:
             book += f'{bid.volume}\t{bid.price}\n'
         return book
-
-    def _update_book(self, quote: Quote, quotes: List[Quote], is_bid: bool) -> None:
-        for x in range(len(quotes)):
-            order = quotes[x]
-            # update volume on level
-            if order.price == quote.price:
-                if quote.volume == 0:
-                    quotes.pop(x)
-                else:
-                    order.volume = quote.volume
-                return
-
-        # quote needs to be placed in book
-        # todo organize bids / asks more efficiently
-        key: Callable = lambda q: q.price
-        if is_bid:
-            key = lambda q: -1 * q.price
-        bisect.insort(quotes, quote, key=key)
-
-        # todo bisect first to find index
-        self.bids = self.bids[:10]
-        self.asks = self.asks[:10]
@@ -0,0 +1,116 @@
+import time
+import asyncio
+from collections import deque
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Deque,
+    Dict,
+    Tuple
+)
+
+from common import get_logger
+from .messages import Pong
+
+if TYPE_CHECKING:
+    from .krak_app import KrakApp
+
+
+class RttStats:
+    """
+    rolling round trip time statistics over the last window pongs of one connection
+    """
+    def __init__(self, window: int):
+        self._rtts: Deque[int] = deque(maxlen=window)
+        self.last_ns: int = 0
+        self.pings: int = 0
+        self.pongs: int = 0
+        self.timeouts: int = 0
+
+    def record(self, rtt_ns: int) -> None:
+        self._rtts.append(rtt_ns)
+        self.last_ns = rtt_ns
+        self.pongs += 1
+
+    def summary(self) -> Dict[str, float]:
+        rtts = sorted(self._rtts)
+        n: int = len(rtts)
+        return {
+            'pings': self.pings,
+            'pongs': self.pongs,
+            'timeouts': self.timeouts,
+            'last_ms': self.last_ns / 1e6,
+            'min_ms': rtts[0] / 1e6 if n else 0,
+            'mean_ms': sum(rtts) / n / 1e6 if n else 0,
+            'p99_ms': rtts[min(n - 1, int(n * 0.99))] / 1e6 if n else 0,
+            'max_ms': rtts[-1] / 1e6 if n else 0
+        }
+
+
+class ConnectionMonitor:
+    """
+    pings the public and private sockets of a KrakApp every interval seconds
+        - pongs are matched to their ping by reqid, round trip times are kept per connection in RttStats
+        - a ping without a pong after pong_timeout seconds counts as a timeout
+        - a connection that has received nothing (data or heartbeat) for stale_after seconds is reported stale
+        - timeouts, stale feeds and round trips above max_rtt are reported through KrakApp.on_connection_alert
+    """
+    def __init__(
+        self,
+        app: 'KrakApp',
+        interval: float = 5,
+        window: int = 100,
+        pong_timeout: float = 5,
+        stale_after: float = 5,
+        max_rtt: Optional[float] = None
+    ):
+        self._app = app
+        self._interval = interval
+        self._pong_timeout_ns: int = int(pong_timeout * 1e9)
+        self._stale_after_ns: int = int(stale_after * 1e9)
+        self._max_rtt_ns: Optional[int] = int(max_rtt * 1e9) if max_rtt else None
+        self.stats: Dict[bool, RttStats] = {False: RttStats(window), True: RttStats(window)}
+        self._pending: Dict[int, Tuple[bool, int]] = {}
+        self._logger = get_logger(f'{__name__}.connection_monitor')
+
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            'private' if is_private else 'public': stats.summary() for is_private, stats in self.stats.items()
+        }
+
+    async def on_pong(self, pong: Pong, receive_ns: int) -> None:
+        pending: Optional[Tuple[bool, int]] = self._pending.pop(pong.reqid, None)
+        if pending:
+            is_private, sent_ns = pending
+            rtt_ns: int = (receive_ns or time.perf_counter_ns()) - sent_ns
+            self.stats[is_private].record(rtt_ns)
+            if self._max_rtt_ns and rtt_ns > self._max_rtt_ns:
+                await self._alert(is_private, f'round trip {rtt_ns / 1e6:.1f}ms')
+
+    async def run(self) -> None:
+        while True:
+            await asyncio.sleep(self._interval)
+            now: int = time.perf_counter_ns()
+
+            for pending_reqid, (pending_private, pending_ns) in list(self._pending.items()):
+                if now - pending_ns > self._pong_timeout_ns:
+                    del self._pending[pending_reqid]
+                    self.stats[pending_private].timeouts += 1
+                    await self._alert(pending_private, f'no pong for ping {pending_reqid}')
+
+            for is_private, client in ((False, self._app._websocket_public), (True, self._app._websocket_private)):
+                if not client:
+                    continue
+                if client.last_receive_ns and now - client.last_receive_ns > self._stale_after_ns:
+                    await self._alert(is_private, f'no message for {(now - client.last_receive_ns) / 1e9:.1f}s')
+                reqid: int = self._app._get_req_id()
+                self._pending[reqid] = (is_private, time.perf_counter_ns())
+                self.stats[is_private].pings += 1
+                try:
+                    await self._app.ping(is_private, reqid)
+                except Exception as e:
+                    self._logger.warning(f'ping failed (private={is_private}): {e}')
+
+    async def _alert(self, is_private: bool, reason: str) -> None:
+        self._logger.warning(f'connection alert (private={is_private}): {reason}')
+        await self._app.on_connection_alert(is_private, reason)
@@ -0,0 +1,144 @@
+import time
+import asyncio
+from datetime import datetime
+from typing import (
+    TYPE_CHECKING,
+    Optional,
+    Dict
+)
+
+from common import get_logger
+from .messages import CancelAllOrdersAfterStatus
+
+if TYPE_CHECKING:
+    from .krak_app import KrakApp
+
+
+def _epoch(iso_time: Optional[str]) -> Optional[float]:
+    """
+    seconds since epoch of kraken's currentTime / triggerTime (2020-12-21T09:37:09Z), None for a disarmed timer (0)
+    """
+    if not iso_time or iso_time == '0':
+        return None
+    return datetime.fromisoformat(iso_time.replace('Z', '+00:00')).timestamp()
+
+
+class DeadMansSwitch:
+    """
+    keeps kraken's cancelAllOrdersAfter timer armed while the event loop is alive
+        - every interval seconds the timer is re-armed to timeout seconds, if the process hangs, crashes or loses
+          the private connection kraken cancels every open order when the timer runs out
+        - a re-arm that wakes up more than max_lag seconds late (a blocked or overloaded event loop) or leaves less
+          than min_remaining seconds on the previous timer is reported through KrakApp.on_dead_mans_switch_alert
+        - the triggerTime of every reply is compared with the send time plus timeout, drift is kraken's clock
+          offset plus the one way latency of the re-arm (triggerTime has a resolution of one second), drift above
+          max_drift is reported too
+        - disarm() sets the timer to 0, which switches it off
+    """
+    def __init__(
+        self,
+        app: 'KrakApp',
+        timeout: int = 60,
+        interval: float = 15,
+        max_lag: float = 1,
+        max_drift: float = 2,
+        min_remaining: Optional[float] = None
+    ):
+        if interval >= timeout:
+            raise ValueError(f'interval ({interval}s) must be shorter than timeout ({timeout}s)')
+        self._app = app
+        self._timeout = timeout
+        self._interval = interval
+        self._max_lag = max_lag
+        self._max_drift = max_drift
+        self._min_remaining: float = min_remaining if min_remaining is not None else (timeout - interval) / 2
+        self._pending: Dict[int, float] = {}
+        self._armed: bool = False
+        self.trigger_time: Optional[float] = None
+        self.last_drift: Optional[float] = None
+        self.worst_drift: float = 0
+        self.worst_lag: float = 0
+        self.rearms: int = 0
+        self.late_rearms: int = 0
+        self.rejects: int = 0
+        self._logger = get_logger(f'{__name__}.dead_mans_switch')
+
+    def get_stats(self) -> dict:
+        return {
+            'armed': self._armed,
+            'timeout': self._timeout,
+            'interval': self._interval,
+            'trigger_time': self.trigger_time,
+            'last_drift': self.last_drift,
+            'worst_drift': self.worst_drift,
+            'worst_lag': self.worst_lag,
+            'rearms': self.rearms,
+            'late_rearms': self.late_rearms,
+            'rejects': self.rejects
+        }
+
+    async def run(self) -> None:
+        self._armed = True
+        try:
+            await self._rearm()
+            expected: float = time.monotonic() + self._interval
+            while True:
+                await asyncio.sleep(max(0.0, expected - time.monotonic()))
+                # disarm() may have run during the sleep
+                if not self._armed:
+                    break
+                lag: float = time.monotonic() - expected
+                self.worst_lag = max(self.worst_lag, lag)
+                if lag > self._max_lag:
+                    self.late_rearms += 1
+                    await self._alert(f're-arm {lag:.3f}s late, event loop lagging')
+                if self.trigger_time is not None:
+                    remaining: float = self.trigger_time - time.time()
+                    if remaining < self._min_remaining:
+                        await self._alert(f'{remaining:.1f}s left on the cancel all timer at re-arm')
+                await self._rearm()
+                expected += self._interval
+                if expected <= time.monotonic():
+                    # skip the missed re-arms rather than sending them back to back
+                    expected = time.monotonic() + self._interval
+        finally:
+            self._armed = False
+
+    async def _rearm(self) -> None:
+        sent: float = time.time()
+        # replies lost with the private connection are not waited for beyond the timer itself
+        self._pending = {req_id: t for req_id, t in self._pending.items() if sent - t < self._timeout}
+        try:
+            req_id: int = await self._app.cancel_all_after(self._timeout)
+        except Exception as e:
+            await self._alert(f're-arm failed: {e}')
+            return
+        self._pending[req_id] = sent
+        self.rearms += 1
+
+    async def disarm(self) -> None:
+        self._armed = False
+        self._pending.clear()
+        await self._app.cancel_all_after(0)
+        self.trigger_time = None
+
+    async def on_status(self, status: CancelAllOrdersAfterStatus) -> None:
+        sent: Optional[float] = self._pending.pop(status.reqid, None) if status.reqid is not None else None
+        if status.status != 'ok':
+            self.rejects += 1
+            await self._alert(f'cancelAllOrdersAfter rejected: {status.errorMessage}')
+            return
+        trigger_time: Optional[float] = _epoch(status.triggerTime)
+        if not self._armed or trigger_time is None:
+            return
+        self.trigger_time = trigger_time
+        if sent is not None:
+            self.last_drift = trigger_time - (sent + self._timeout)
+            if abs(self.last_drift) > abs(self.worst_drift):
+                self.worst_drift = self.last_drift
+            if abs(self.last_drift) > self._max_drift:
+                await self._alert(f'triggerTime drifted {self.last_drift:.3f}s from the re-arm time')
+
+    async def _alert(self, reason: str) -> None:
+        self._logger.warning(f'dead man\'s switch alert: {reason}')
+        await self._app.on_dead_mans_switch_alert(reason)
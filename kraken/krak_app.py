@@ -1,4 +1,6 @@
 import sys
+import asyncio
+from collections import OrderedDict
 from typing import (
     Optional,
     Dict,
@@ -7,7 +9,12 @@ from typing import (
 )
 
 from .krak_app_base import KrakAppBase
+from .connection_monitor import ConnectionMonitor
+from .dead_mans_switch import DeadMansSwitch
+from .order_encoder import OrderEncoder
 from common import (
+    RATE_LIMIT_ERROR,
+    OrderRateLimiter,
     get_logger,
     Trade,
     Order, 
@@ -15,6 +22,8 @@ from common import (
     Side
 )
 from .messages import (
+    BatchCancelStatus,
+    BatchOrderStatus,
     CancelAllOrdersAfterStatus,
     SubscriptionStatus,
     CancelAllStatus,
@@ -26,6 +35,7 @@ from .messages import (
     OrderStatus,
     BookUpdate,
     Heartbeat,
+    bookUpdatePool,
     Spread,
     Ticker,
     Ping,
@@ -33,6 +43,26 @@ from .messages import (
     Ohlc
 )
 
+# kraken's limits on the number of orders in one batchOrder (all of the same pair) and one batchCancel
+MAX_BATCH_ORDERS: int = 15
+MAX_BATCH_CANCELS: int = 50
+
+# how many timed out reqids are remembered to deal with their late replies
+MAX_TIMED_OUT_ACKS: int = 1000
+
+
+class PendingAck:
+    """
+    a future waiting for the reply to one order action, with its timeout timer
+    """
+    __slots__ = ('future', 'order', 'event', 'timer')
+
+    def __init__(self, future: 'asyncio.Future[OrderStatus]', order: Order, event: str):
+        self.future = future
+        self.order = order
+        self.event = event
+        self.timer: Optional[asyncio.TimerHandle] = None
+
 
 class KrakApp(KrakAppBase):
     """
@@ -42,6 +72,8 @@ class KrakApp(KrakAppBase):
             > app.new_order_single(order)  # send an order to kraken, then based on the response:
                 # on_new_order_ack(order: Order) will be triggered to confirm your order is working on the exchange
                 # on_new_order_reject(order_status: OrderStatus) will be triggered meaning the order was rejected
+        - new_order_single, replace_order and cancel_order(..., await_ack=True) also return a future resolved with
+          the OrderStatus of the ack or reject, so many orders can be sent and awaited together (asyncio.gather)
     """
     def __init__(
         self, 
@@ -49,19 +81,161 @@ class KrakApp(KrakAppBase):
         auth_url: Optional[str] = None,
         http_url: Optional[str] = None,
         key: Optional[str] = None,
-        secret: Optional[str] = None
+        secret: Optional[str] = None,
+        queue_size: int = 0
     ):
-        super().__init__(url, auth_url, http_url, key, secret)
+        super().__init__(url, auth_url, http_url, key, secret, queue_size)
         self._logger = get_logger(__name__)
 
         #
         self._req_count: int = 0
         self._orig_req_id: int = 10000000000
+        self.connection_monitor: Optional[ConnectionMonitor] = None
+        self.rate_limiter: Optional[OrderRateLimiter] = None
+        self.dead_mans_switch: Optional[DeadMansSwitch] = None
+        self._order_encoder: OrderEncoder = OrderEncoder()
+        self._batch_orders: Dict[int, List[Order]] = {}
+        self._batch_cancels: Dict[int, List[Order]] = {}
+        self._pending_acks: Dict[int, PendingAck] = {}
+        self._timed_out_acks: OrderedDict[int, Order] = OrderedDict()
+        self._ack_timeout: Optional[float] = None
+        self._cancel_on_ack_timeout: bool = False
 
     def _get_req_id(self) -> int:
         self._req_count += 1
         return self._orig_req_id + self._req_count
 
+    def enable_connection_monitor(self, interval: float = 5, **kwargs) -> ConnectionMonitor:
+        """
+        pings both sockets every interval seconds once started, see ConnectionMonitor for the other options
+        """
+        self.connection_monitor = ConnectionMonitor(self, interval, **kwargs)
+        return self.connection_monitor
+
+    def enable_dead_mans_switch(self, timeout: int = 60, interval: float = 15, **kwargs) -> DeadMansSwitch:
+        """
+        re-arms cancelAllOrdersAfter(timeout) every interval seconds once started, see DeadMansSwitch for the
+        other options
+        """
+        self.dead_mans_switch = DeadMansSwitch(self, timeout, interval, **kwargs)
+        return self.dead_mans_switch
+
+    def enable_rate_limiter(self, tier: str = 'starter', **kwargs) -> OrderRateLimiter:
+        """
+        checks new_order_single, replace_order and cancel_order against a local model of kraken's per pair rate
+        counter, see OrderRateLimiter for the other options
+            - actions that would exceed the counter are delayed or rejected through the usual reject callbacks
+        """
+        self.rate_limiter = OrderRateLimiter(tier, **kwargs)
+        return self.rate_limiter
+
+    def enable_ack_timeouts(self, timeout: float = 5, cancel_on_timeout: bool = False) -> None:
+        """
+        fails the futures of order actions that get no reply within timeout seconds with asyncio.TimeoutError
+        and triggers on_order_ack_timeout
+            - with cancel_on_timeout the order of a timed out edit or cancel is cancelled (again) straight away,
+              a timed out new order is cancelled as soon as its late ack tells us its order id
+        """
+        self._ack_timeout = timeout
+        self._cancel_on_ack_timeout = cancel_on_timeout
+
+    def _expect_ack(self, order: Order, req_id: int, event: str) -> 'asyncio.Future[OrderStatus]':
+        loop: asyncio.AbstractEventLoop = asyncio.get_running_loop()
+        pending: PendingAck = PendingAck(loop.create_future(), order, event)
+        if self._ack_timeout:
+            pending.timer = loop.call_later(self._ack_timeout, self._on_ack_timeout, req_id)
+        self._pending_acks[req_id] = pending
+        return pending.future
+
+    async def _send_order_frame(self, frame: str, req_id: int) -> None:
+        """
+        sends an order frame, the ack expected for it is dropped if the send fails
+        """
+        try:
+            await self.send_private_frame(frame)
+        except BaseException:
+            pending: Optional[PendingAck] = self._pending_acks.pop(req_id, None)
+            if pending:
+                if pending.timer:
+                    pending.timer.cancel()
+                pending.future.cancel()
+            raise
+
+    async def _send_batch_frame(self, frame: str, req_id: int, batches: Dict[int, List[Order]]) -> None:
+        """
+        sends a batch frame, the batch waiting for its reply is dropped if the send fails
+        """
+        try:
+            await self.send_private_frame(frame)
+        except BaseException:
+            batches.pop(req_id, None)
+            raise
+
+    @staticmethod
+    def _rejected_ack(reject: OrderStatus) -> 'asyncio.Future[OrderStatus]':
+        future: asyncio.Future[OrderStatus] = asyncio.get_running_loop().create_future()
+        future.set_result(reject)
+        return future
+
+    def _resolve_ack(self, status: OrderStatus) -> Optional[Order]:
+        """
+        :return: the order if its ack had already timed out
+        """
+        pending: Optional[PendingAck] = self._pending_acks.pop(status.reqid, None)
+        if pending is None:
+            return self._timed_out_acks.pop(status.reqid, None) if self._timed_out_acks else None
+        if pending.timer:
+            pending.timer.cancel()
+        if not pending.future.done():
+            pending.future.set_result(status)
+        return None
+
+    def _on_ack_timeout(self, req_id: int) -> None:
+        pending: Optional[PendingAck] = self._pending_acks.pop(req_id, None)
+        if pending is None:
+            return
+        if not pending.future.done():
+            pending.future.set_exception(asyncio.TimeoutError(f'{pending.event} {req_id} timed out'))
+        self._timed_out_acks[req_id] = pending.order
+        if len(self._timed_out_acks) > MAX_TIMED_OUT_ACKS:
+            self._timed_out_acks.popitem(last=False)
+        asyncio.ensure_future(self._ack_timed_out(pending))
+
+    async def _ack_timed_out(self, pending: PendingAck) -> None:
+        self._logger.warning(f'no reply to {pending.event} {pending.order.clorder_id} in {self._ack_timeout}s')
+        await self.on_order_ack_timeout(pending.order, pending.event)
+        if self._cancel_on_ack_timeout and pending.event != 'addOrder' and pending.order.order_id:
+            await self.cancel_order(pending.order)
+
+    async def _cancel_late_ack(self, order: Optional[Order], status: OrderStatus) -> None:
+        if order and self._cancel_on_ack_timeout and status.status == 'ok' and status.txid:
+            self._logger.warning(f'late ack for {status.reqid} after timeout, cancelling {status.txid}')
+            order.order_id = status.txid
+            await self.cancel_order(order)
+
+    def rate_headroom(self, symbol: str) -> Optional[float]:
+        """
+        :return: how much of the symbol's rate counter is left, None without a rate limiter
+        """
+        return self.rate_limiter.headroom(symbol) if self.rate_limiter else None
+
+    async def _throttle(self, symbol: str, cost: float, event: str, req_id: int) -> Optional[OrderStatus]:
+        """
+        :return: a local reject status if the action must not be sent
+        """
+        if not self.rate_limiter or await self.rate_limiter.acquire(symbol, cost):
+            return None
+        return OrderStatus({'event': event, 'status': 'error', 'reqid': req_id, 'errorMessage': RATE_LIMIT_ERROR})
+
+    async def start(self, tasks=None) -> None:
+        if tasks is None:
+            tasks = []
+        if self.connection_monitor:
+            tasks.append(self.connection_monitor.run())
+        if self.dead_mans_switch:
+            tasks.append(self.dead_mans_switch.run())
+        await super().start(tasks=tasks)
+
     async def _on_trade(self, trade_update: TradePayload) -> None:
         for trade in trade_update.trades:
             await self.on_trade(trade)
@@ -85,6 +259,8 @@ class KrakApp(KrakAppBase):
             order_id: str = next(iter(message))
             krak_order: dict = message[order_id]
             status: Optional[str] = krak_order.get('status')
+            if self.rate_limiter and 'opentm' in krak_order:
+                self.rate_limiter.on_order_placed(order_id, float(krak_order['opentm']))
             match status:
                 case 'pending':
                     order: Order = Order(
@@ -102,40 +278,48 @@ class KrakApp(KrakAppBase):
                 case 'open':
                     await self.on_open_order_new(order_id)
                 case 'canceled':
+                    if self.rate_limiter:
+                        self.rate_limiter.on_order_closed(order_id)
                     await self.on_open_order_cancel(order_id)
                 case _:
                     self._logger.error(f'openOrders -> unknown order status: ({message})')
 
-    async def new_order_single(self, order: Order) -> None:
+    async def new_order_single(self, order: Order, await_ack: bool = False) -> Optional['asyncio.Future[OrderStatus]']:
         req_id: int = self._get_req_id()
+        # encoded before any state changes, an invalid price or volume raises without side effects
+        frame: str = self._order_encoder.new_order(self._token, order, req_id)
         order.clorder_id = req_id
-        js: dict = {
-            'pair': order.symbol,
-            'type': 'buy' if order.side == Side.BUY else 'sell',
-            'token': self._token,
-            'volume': str(order.qty),
-            'price': str(order.price),
-            'ordertype': order.order_type,
-            'event': 'addOrder',
-            'timeinforce': 'GTC',
-            'reqid': req_id
-        }
-        await self.send_private(js)
+        reject: Optional[OrderStatus] = await self._throttle(order.symbol, 1, 'addOrderStatus', req_id)
+        if reject:
+            await self.on_new_order_reject(reject)
+            return self._rejected_ack(reject) if await_ack else None
+        ack: Optional[asyncio.Future[OrderStatus]] = self._expect_ack(order, req_id, 'addOrder') if await_ack else None
+        await self._send_order_frame(frame, req_id)
         await self.on_new_order_single(order)
-
-    async def replace_order(self, order: Order, price: float, qty: float) -> None:
+        return ack
+
+    async def replace_order(
+        self,
+        order: Order,
+        price: float,
+        qty: float,
+        await_ack: bool = False
+    ) -> Optional['asyncio.Future[OrderStatus]']:
+        if not order.order_id:
+            raise ValueError(f'cannot replace order {order.clorder_id}: no txid, the order is not acknowledged yet')
         req_id: int = self._get_req_id()
+        frame: str = self._order_encoder.replace_order(self._token, order, price, qty, req_id)
         order.clorder_id = req_id
-        js: dict = {
-            'pair': order.symbol,
-            'event': 'editOrder',
-            'token': self._token,
-            'orderid': order.order_id,
-            'price': str(price),
-            'volume': str(qty),
-            'reqid': req_id
-        }
-        await self.send_private(js)
+        if self.rate_limiter:
+            reject: Optional[OrderStatus] = await self._throttle(
+                order.symbol, self.rate_limiter.edit_cost(order.order_id), 'editOrderStatus', req_id
+            )
+            if reject:
+                await self.on_replace_order_reject(reject)
+                return self._rejected_ack(reject) if await_ack else None
+            self.rate_limiter.on_order_closed(order.order_id)
+        ack: Optional[asyncio.Future[OrderStatus]] = self._expect_ack(order, req_id, 'editOrder') if await_ack else None
+        await self._send_order_frame(frame, req_id)
         pending: Order = Order(
             order.symbol,
             order.side,
@@ -148,17 +332,25 @@ class KrakApp(KrakAppBase):
         )
         pending.order_id = order.order_id
         await self.on_replace_order(pending)
+        return ack
 
-    async def cancel_order(self, order: Order) -> None:
+    async def cancel_order(self, order: Order, await_ack: bool = False) -> Optional['asyncio.Future[OrderStatus]']:
+        if not order.order_id:
+            raise ValueError(f'cannot cancel order {order.clorder_id}: no txid, the order is not acknowledged yet')
         req_id: int = self._get_req_id()
+        frame: str = self._order_encoder.cancel_order(self._token, order, req_id)
         order.clorder_id = req_id
-        js: dict = {
-            'event': 'cancelOrder',
-            'token': self._token,
-            'txid': [order.order_id],
-            'reqid': req_id
-        }
-        await self.send_private(js)
+        if self.rate_limiter:
+            reject: Optional[OrderStatus] = await self._throttle(
+                order.symbol, self.rate_limiter.cancel_cost(order.order_id), 'cancelOrderStatus', req_id
+            )
+            if reject:
+                await self.on_cancel_order_reject(reject)
+                return self._rejected_ack(reject) if await_ack else None
+            self.rate_limiter.on_order_closed(order.order_id)
+        ack: Optional[asyncio.Future[OrderStatus]] = \
+            self._expect_ack(order, req_id, 'cancelOrder') if await_ack else None
+        await self._send_order_frame(frame, req_id)
         pending: Order = Order(
             order.symbol,
             order.side,
@@ -171,6 +363,87 @@ class KrakApp(KrakAppBase):
         )
         pending.order_id = order.order_id
         await self.on_cancel_order(pending)
+        return ack
+
+    async def batch_new_orders(self, orders: List[Order]) -> None:
+        """
+        sends the orders with batchOrder events, grouped by symbol and split into batches of MAX_BATCH_ORDERS
+            - every order gets its own clorder_id and on_new_order_single, the batch is sent under another reqid
+            - the batch reply is fanned out to on_new_order_ack / on_new_order_reject per order
+            - a symbol with a single order is sent with new_order_single
+        """
+        by_symbol: Dict[str, List[Order]] = {}
+        for order in orders:
+            by_symbol.setdefault(order.symbol, []).append(order)
+        for symbol, symbol_orders in by_symbol.items():
+            for i in range(0, len(symbol_orders), MAX_BATCH_ORDERS):
+                batch: List[Order] = symbol_orders[i:i + MAX_BATCH_ORDERS]
+                if len(batch) == 1:
+                    await self.new_order_single(batch[0])
+                    continue
+                req_id: int = self._get_req_id()
+                # encoded before any state changes, an invalid price or volume raises without side effects
+                frame: str = self._order_encoder.batch_order(self._token, batch, req_id)
+                for order in batch:
+                    order.clorder_id = self._get_req_id()
+                reject: Optional[OrderStatus] = await self._throttle(symbol, len(batch), 'addOrderStatus', req_id)
+                if reject:
+                    for order in batch:
+                        await self.on_new_order_reject(OrderStatus({
+                            'event': 'addOrderStatus',
+                            'status': 'error',
+                            'reqid': order.clorder_id,
+                            'errorMessage': RATE_LIMIT_ERROR
+                        }))
+                    continue
+                self._batch_orders[req_id] = batch
+                await self._send_batch_frame(frame, req_id, self._batch_orders)
+                for order in batch:
+                    await self.on_new_order_single(order)
+
+    async def batch_cancel(self, orders: List[Order]) -> None:
+        """
+        cancels the orders with batchCancel events of up to MAX_BATCH_CANCELS orders
+            - every order gets its own clorder_id and on_cancel_order, the batch is sent under another reqid
+            - the batch reply is fanned out to on_cancel_order_ack / on_cancel_order_reject per order
+            - raises ValueError before anything is sent if an order has no txid (not acknowledged yet)
+        """
+        for order in orders:
+            if not order.order_id:
+                raise ValueError(f'cannot cancel order {order.clorder_id}: no txid, the order is not acknowledged yet')
+        for i in range(0, len(orders), MAX_BATCH_CANCELS):
+            batch: List[Order] = []
+            for order in orders[i:i + MAX_BATCH_CANCELS]:
+                order.clorder_id = self._get_req_id()
+                if self.rate_limiter:
+                    reject: Optional[OrderStatus] = await self._throttle(
+                        order.symbol, self.rate_limiter.cancel_cost(order.order_id), 'cancelOrderStatus',
+                        order.clorder_id
+                    )
+                    if reject:
+                        await self.on_cancel_order_reject(reject)
+                        continue
+                    self.rate_limiter.on_order_closed(order.order_id)
+                batch.append(order)
+            if not batch:
+                continue
+            req_id: int = self._get_req_id()
+            frame: str = self._order_encoder.batch_cancel(self._token, batch, req_id)
+            self._batch_cancels[req_id] = batch
+            await self._send_batch_frame(frame, req_id, self._batch_cancels)
+            for order in batch:
+                pending: Order = Order(
+                    order.symbol,
+                    order.side,
+                    order.clorder_id,
+                    order.qty,
+                    order.price,
+                    order.order_type,
+                    'cancelOrder',
+                    order.time_in_force
+                )
+                pending.order_id = order.order_id
+                await self.on_cancel_order(pending)
 
     async def subscribe(self, subscription: dict, is_private: bool = False, pair=None):
         if is_private:
@@ -178,15 +451,18 @@ class KrakApp(KrakAppBase):
         else:
             await self.subscribe_public(subscription, pair=pair)
 
-    async def ping(self, is_private: bool) -> None:
+    async def ping(self, is_private: bool, req_id: Optional[int] = None) -> int:
+        if req_id is None:
+            req_id = self._get_req_id()
         js: dict = {
             'event': 'ping',
-            'reqid': self._get_req_id()
+            'reqid': req_id
         }
         if is_private:
             await self.send_private(js)
         else:
             await self.send_public(js)
+        return req_id
 
     async def cancel_all(self) -> None:
         await self.send_private({
@@ -195,34 +471,53 @@ class KrakApp(KrakAppBase):
             'reqid': self._get_req_id()
         })
 
-    async def cancel_all_after(self, timeout: int) -> None:
+    async def cancel_all_after(self, timeout: int) -> int:
+        """
+        :param timeout: seconds until kraken cancels all open orders unless re-armed, 0 disarms the timer
+        :return: the reqid of the request
+        """
+        req_id: int = self._get_req_id()
         await self.send_private({
             'event': 'cancelAllOrdersAfter',
             'token': self._token,
             'timeout': timeout,
-            'reqid': self._get_req_id()
+            'reqid': req_id
         })
+        return req_id
 
     async def on_book_snapshot(self, snapshot: list) -> None:
-        await self.on_book_update_snapshot(BookSnapshot(*snapshot))
+        book_snapshot: BookSnapshot = BookSnapshot(*snapshot)
+        try:
+            await self.on_book_update_snapshot(book_snapshot)
+        finally:
+            book_snapshot.clean()
 
     async def on_book(self, update: list) -> None:
-        if len(update) > 4:
-            quote = update.pop(2)
-            await self.on_book_update(BookUpdate(*update))
-
-            update[1] = quote
-            await self.on_book_update(BookUpdate(*update))
-
-        else:
-            book_update: BookUpdate = BookUpdate(*update)
+        """
+        book updates and their quotes are pooled, they are only valid for the duration of on_book_update
+            - a frame carrying both sides ([channelID, {a}, {b}, channelName, pair]) is merged into one update
+        """
+        quotes: Dict[str, Any] = update[1] if len(update) == 4 else {**update[1], **update[2]}
+        book_update: BookUpdate = bookUpdatePool.acquire().init(update[0], quotes, update[-2], update[-1])
+        if self.latency:
+            self.latency.on_exchange_time(
+                book_update.channelName,
+                self._receive_ns,
+                max((quote.timestamp for quotes in (book_update.b, book_update.a) for quote in quotes), default=0)
+            )
+        try:
             await self.on_book_update(book_update)
+        finally:
+            bookUpdatePool.release(book_update)
 
     async def on_ohlc_(self, ohlc: list) -> None:
         await self.on_ohlc(Ohlc(*ohlc))
 
     async def on_trade_(self, trade: list) -> None:
-        await self._on_trade(TradePayload(*trade))
+        trade_payload: TradePayload = TradePayload(*trade)
+        if self.latency and trade_payload.trades:
+            self.latency.on_exchange_time(trade_payload.channelName, self._receive_ns, trade_payload.trades[-1].time)
+        await self._on_trade(trade_payload)
 
     async def on_spread_(self, spread: list) -> None:
         await self.on_spread(SpreadPayload(*spread).spread)
@@ -239,39 +534,103 @@ class KrakApp(KrakAppBase):
     async def on_subscription_status_(self, js: dict) -> None:
         await self.on_subscription_status(SubscriptionStatus(js))
 
+    async def on_connection_lost_(self, is_private: bool) -> None:
+        await self.on_connection_lost(is_private)
+        if not is_private:
+            await self.on_book_invalidated()
+
+    async def on_connection_restored_(self, is_private: bool) -> None:
+        await self.on_connection_restored(is_private)
+
     async def on_heartbeat_(self, heartbeat: dict) -> None:
-        await self.on_heartbeat(Heartbeat(*heartbeat))
+        await self.on_heartbeat(Heartbeat(heartbeat['event']))
 
     async def on_ping_(self, ping: dict) -> None:
-        await self.on_ping(Ping(*ping))
+        await self.on_ping(Ping(ping['event']))
 
     async def on_pong_(self, pong: dict) -> None:
-        await self.on_pong(Pong(*pong))
+        message: Pong = Pong(pong['event'], pong.get('reqid', 0))
+        if self.connection_monitor:
+            await self.connection_monitor.on_pong(message, self._receive_ns)
+        await self.on_pong(message)
 
     async def on_system_status_(self, js: dict) -> None:
         await self.on_system_status(SystemStatus(**js))
 
     async def on_add_order_status(self, js: dict) -> None:
         add_order_status: OrderStatus = OrderStatus(js)
+        timed_out: Optional[Order] = self._resolve_ack(add_order_status)
         if add_order_status.status != 'ok':
             await self.on_new_order_reject(add_order_status)
         else:
+            if self.rate_limiter and add_order_status.txid:
+                self.rate_limiter.on_order_placed(add_order_status.txid)
             await self.on_new_order_ack(add_order_status.txid, add_order_status.reqid)
+        await self._cancel_late_ack(timed_out, add_order_status)
 
     async def on_edit_order_status(self, js: dict) -> None:
         replace_order_status: OrderStatus = OrderStatus(js)
+        timed_out: Optional[Order] = self._resolve_ack(replace_order_status)
         if replace_order_status.status != 'ok':
             await self.on_replace_order_reject(replace_order_status)
         else:
+            if self.rate_limiter and replace_order_status.txid:
+                self.rate_limiter.on_order_placed(replace_order_status.txid)
             await self.on_replace_order_ack(replace_order_status.txid, replace_order_status.reqid)
+        await self._cancel_late_ack(timed_out, replace_order_status)
 
     async def on_cancel_order_status(self, js: dict) -> None:
         cancel_order_status: OrderStatus = OrderStatus(js)
+        self._resolve_ack(cancel_order_status)
         if cancel_order_status.status != 'ok':
             await self.on_cancel_order_reject(cancel_order_status)
         else:
             await self.on_cancel_order_ack(cancel_order_status.reqid)
 
+    async def on_batch_order_status(self, js: dict) -> None:
+        status: BatchOrderStatus = BatchOrderStatus(js)
+        batch: Optional[List[Order]] = self._batch_orders.pop(status.reqid, None)
+        if batch is None:
+            self._logger.warning(f'batchOrderStatus for unknown reqid {status.reqid}')
+            return
+        for i, order in enumerate(batch):
+            result: Dict[str, Any] = status.result[i] if i < len(status.result) else {}
+            if status.status == 'ok':
+                child_status: str = result.get('status', 'ok' if result.get('txid') else 'error')
+            else:
+                child_status = status.status
+            order_status: OrderStatus = OrderStatus({
+                'event': 'addOrderStatus',
+                'status': child_status,
+                'reqid': order.clorder_id,
+                'txid': result.get('txid'),
+                'descr': result.get('descr'),
+                'errorMessage': result.get('errorMessage', status.errorMessage)
+            })
+            if order_status.status != 'ok':
+                await self.on_new_order_reject(order_status)
+            else:
+                if self.rate_limiter and order_status.txid:
+                    self.rate_limiter.on_order_placed(order_status.txid)
+                await self.on_new_order_ack(order_status.txid, order_status.reqid)
+
+    async def on_batch_cancel_status(self, js: dict) -> None:
+        status: BatchCancelStatus = BatchCancelStatus(js)
+        batch: Optional[List[Order]] = self._batch_cancels.pop(status.reqid, None)
+        if batch is None:
+            self._logger.warning(f'batchCancelStatus for unknown reqid {status.reqid}')
+            return
+        for order in batch:
+            if status.status != 'ok':
+                await self.on_cancel_order_reject(OrderStatus({
+                    'event': 'cancelOrderStatus',
+                    'status': status.status,
+                    'reqid': order.clorder_id,
+                    'errorMessage': status.errorMessage
+                }))
+            else:
+                await self.on_cancel_order_ack(order.clorder_id)
+
     async def on_cancel_all_status(self, js: dict) -> None:
         status: CancelAllStatus = CancelAllStatus(js)
         if status.status != 'ok':
@@ -281,6 +640,8 @@ class KrakApp(KrakAppBase):
 
     async def on_cancel_all_after_status_(self, js: dict) -> None:
         status: CancelAllOrdersAfterStatus = CancelAllOrdersAfterStatus(js)
+        if self.dead_mans_switch:
+            await self.dead_mans_switch.on_status(status)
         if status.status != 'ok':
             await self.on_cancel_all_after_status_reject(status)
         else:
@@ -352,6 +713,14 @@ class KrakApp(KrakAppBase):
         :return:
         """
 
+    async def on_order_ack_timeout(self, order: Order, event: str) -> None:
+        """
+        triggered when an order action sent with await_ack got no reply in time, see enable_ack_timeouts
+        :param order:
+        :param event: addOrder, editOrder or cancelOrder
+        :return:
+        """
+
     async def on_ticker(self, ticker: Ticker) -> None:
         """
         triggered after receiving a ticker message
@@ -379,3 +748,38 @@ class KrakApp(KrakAppBase):
         :param ping:
         :return:
         """
+
+    async def on_connection_lost(self, is_private: bool) -> None:
+        """
+        triggered when the public or private websocket drops, before reconnecting
+        :param is_private:
+        :return:
+        """
+
+    async def on_connection_restored(self, is_private: bool) -> None:
+        """
+        triggered after the websocket reconnected and its subscriptions were replayed
+        :param is_private:
+        :return:
+        """
+
+    async def on_connection_alert(self, is_private: bool, reason: str) -> None:
+        """
+        triggered by the connection monitor on ping timeouts, slow round trips and stale feeds
+        :param is_private:
+        :param reason:
+        :return:
+        """
+
+    async def on_dead_mans_switch_alert(self, reason: str) -> None:
+        """
+        triggered by the dead man's switch on late re-arms, triggerTime drift and rejected re-arms
+        :param reason:
+        :return:
+        """
+
+    async def on_book_invalidated(self) -> None:
+        """
+        triggered when the public feed drops, books built from it are stale until the next snapshot
+        :return:
+        """
@@ -1,18 +1,39 @@
-import json
+import time
 import asyncio
 from typing import (
     Optional,
+    Callable,
+    Awaitable,
+    Union,
+    Tuple,
     Dict,
     List,
+    Type,
     Any
 )
 
 from common import (
     WebsocketClient,
     WebsocketHandler,
+    LatencyMonitor,
+    RestClient,
+    JsonCodec,
     get_logger,
+    get_codec
 )
 
+ChannelHandler = Callable[[List[Any]], Awaitable[None]]
+
+
+class KrakenApiError(Exception):
+    """
+    a REST call answered with kraken error messages
+    """
+    def __init__(self, uri: str, errors: List[str]):
+        super().__init__(f'{uri} -> {errors}')
+        self.uri = uri
+        self.errors = errors
+
 
 class KrakAppBase(WebsocketHandler):
     """
@@ -24,7 +45,17 @@ class KrakAppBase(WebsocketHandler):
             - recv
             - subscribe
             - unsubscribe
-        - if authentication parameters are given, this class retrieves the token required to make subsequent requests
+        - if authentication parameters are given, this class retrieves the token required to make subsequent requests,
+          the token is fetched through the async RestClient while the public socket connects
+        - private_request / public_request call other REST endpoints over the same pooled keep-alive connections
+        - channel messages are routed by channelID once kraken acknowledges the subscription,
+          messages on channels that are not (yet) known are routed by channel name
+        - a book channel is routed to its snapshot handler until the snapshot arrives, then straight to on_book
+        - dropped connections are reconnected, the private token is refreshed and every active
+          subscription is replayed on the reconnected socket
+        - with a queue_size the sockets are read by their own tasks (see WebsocketClient) and when processing
+          falls behind, the pending book updates of each channel are conflated into a single update
+        - enable_latency_monitor() records per message type latency histograms, disabled it costs one check
     """
     def __init__(
             self,
@@ -32,48 +63,113 @@ class KrakAppBase(WebsocketHandler):
             auth_url: Optional[str] = None,
             http_url: Optional[str] = None,
             key: Optional[str] = None,
-            secret: Optional[str] = None
+            secret: Optional[str] = None,
+            queue_size: int = 0
     ):
         self._http_url = http_url
-        self._http_uri: str = '/0/private/GetWebSocketsToken'
         self._key = key
         self._secret = secret
+        self._last_nonce: int = 0
 
         self._token: Optional[str] = None
+        self._rest: Optional[RestClient] = RestClient(http_url) if http_url else None
         self._websocket_public: Optional[WebsocketClient] = None
         self._websocket_private: Optional[WebsocketClient] = None
 
-        if self._key and self._secret and self._http_url and auth_url:
-            self._token = self._get_token()
-
         if url:
-            self._websocket_public = WebsocketClient(url)
+            self._websocket_public = WebsocketClient(url, reconnect=True, queue_size=queue_size)
+
+        if self._key and self._secret and self._rest and auth_url:
+            self._websocket_private = WebsocketClient(auth_url, reconnect=True, queue_size=queue_size)
 
-        if self._token and auth_url:
-            self._websocket_private = WebsocketClient(auth_url)
+        #
+        self._public_subscriptions: Dict[Tuple[Any, ...], Tuple[dict, Optional[str]]] = {}
+        self._private_subscriptions: Dict[Tuple[Any, ...], dict] = {}
+
+        #
+        self._codec: Type[JsonCodec] = get_codec()
+        self._channel_handlers: Dict[int, ChannelHandler] = {}
+        self.conflated_frames: int = 0
+        self.latency: Optional[LatencyMonitor] = None
+        self._latency_export_interval: Optional[float] = None
+        self._receive_ns: int = 0
+        self._channel_name_handlers: Dict[str, ChannelHandler] = {
+            'book-10': self._on_book_message,
+            'book-25': self._on_book_message,
+            'book-100': self._on_book_message,
+            'book-500': self._on_book_message,
+            'book-1000': self._on_book_message,
+            'trade': self.on_trade_,
+            'spread': self.on_spread_,
+            'ohlc-1': self.on_ohlc_,
+            'ohlc-5': self.on_ohlc_,
+            'ohlc-15': self.on_ohlc_,
+            'ohlc-30': self.on_ohlc_,
+            'ohlc-60': self.on_ohlc_,
+            'ohlc-240': self.on_ohlc_,
+            'ohlc-1440': self.on_ohlc_,
+            'ohlc-10080': self.on_ohlc_,
+            'ohlc-21600': self.on_ohlc_,
+            'ticker': self.on_ticker_,
+            'openOrders': self.on_open_orders,
+            'ownTrades': self.on_own_trades
+        }
 
         #
         self._logger = get_logger(__name__)
 
     async def connect(self) -> None:
+        """
+        connects both sockets and fetches the private token concurrently
+        """
+        connecting: List[Awaitable[None]] = []
         if self._websocket_public:
-            await self._websocket_public.connect()
+            connecting.append(self._websocket_public.connect())
 
         if self._websocket_private:
-            await self._websocket_private.connect()
+            connecting.append(self._websocket_private.connect())
+            connecting.append(self._refresh_token())
+
+        await asyncio.gather(*connecting)
+
+    async def _refresh_token(self) -> None:
+        self._token = await self._get_token()
+
+    async def close(self) -> None:
+        if self._websocket_public:
+            await self._websocket_public.close()
+        if self._websocket_private:
+            await self._websocket_private.close()
+        if self._rest:
+            await self._rest.close()
 
     async def start(self, tasks=None) -> None:
         if tasks is None:
             tasks = []
+        if self._websocket_private and self._token is None:
+            await self._refresh_token()
         if self._websocket_public:
             tasks.append(self._websocket_public.read_til_close(self))
 
         if self._websocket_private:
             tasks.append(self._websocket_private.read_til_close(self))
 
+        if self.latency and self._latency_export_interval:
+            tasks.append(self.latency.export(self._latency_export_interval))
+
         await asyncio.gather(*tasks)
 
+    def enable_latency_monitor(self, export_interval: Optional[float] = None) -> LatencyMonitor:
+        """
+        :param export_interval: log (and reset) the histograms every export_interval seconds once started
+        """
+        self.latency = LatencyMonitor()
+        self._latency_export_interval = export_interval
+        return self.latency
+
     async def subscribe_private(self, subscription: dict, req_id=None) -> None:
+        self._private_subscriptions[self._subscription_key(subscription)] = \
+            {k: v for k, v in subscription.items() if k != 'token'}
         subscription['token'] = self._token
         js: dict = {
             'event': 'subscribe',
@@ -84,6 +180,8 @@ class KrakAppBase(WebsocketHandler):
         await self.send_private(js)
 
     async def subscribe_public(self, subscription: dict, pair=None, req_id=None) -> None:
+        for p in pair or [None]:
+            self._public_subscriptions[(self._subscription_key(subscription), p)] = (dict(subscription), p)
         js: dict = {
             'event': 'subscribe',
             'subscription': subscription
@@ -95,6 +193,7 @@ class KrakAppBase(WebsocketHandler):
         await self.send_public(js)
 
     async def unsubscribe_private(self, subscription: dict) -> None:
+        self._private_subscriptions.pop(self._subscription_key(subscription), None)
         subscription['token'] = self._token
         await self.send_private({
             'event': 'unsubscribe',
@@ -102,96 +201,198 @@ class KrakAppBase(WebsocketHandler):
         })
 
     async def unsubscribe_public(self, pair: List[str], subscription: dict) -> None:
+        for p in pair:
+            self._public_subscriptions.pop((self._subscription_key(subscription), p), None)
         await self.send_public({
             'event': 'unsubscribe',
             'pair': pair,
             'subscription': subscription
         })
 
+    @staticmethod
+    def _subscription_key(subscription: dict) -> Tuple[Any, ...]:
+        return tuple(sorted((k, v) for k, v in subscription.items() if k != 'token'))
+
+    async def on_disconnect(self, client: WebsocketClient) -> None:
+        is_private: bool = client is self._websocket_private
+        if not is_private:
+            # channelIDs are reassigned by kraken when the subscriptions are replayed
+            self._channel_handlers.clear()
+        await self.on_connection_lost_(is_private)
+
+    async def on_reconnect(self, client: WebsocketClient) -> bool:
+        is_private: bool = client is self._websocket_private
+        if is_private:
+            try:
+                await self._refresh_token()
+            except Exception as e:
+                # transient REST failures (timeouts, 5xx, EAPI:Rate limit) are retried with the reconnect backoff
+                self._logger.warning(f'token refresh failed after reconnect: {e!r}')
+                return False
+            for subscription in list(self._private_subscriptions.values()):
+                await self.subscribe_private(dict(subscription))
+        else:
+            for subscription, pair in list(self._public_subscriptions.values()):
+                await self.subscribe_public(dict(subscription), pair=[pair] if pair else None)
+        self._logger.info(f'resubscribed after reconnect (private={is_private})')
+        await self.on_connection_restored_(is_private)
+        return True
+
     async def send_public(self, js: dict):
         if self._websocket_public:
             await self._websocket_public.send(
-                json.dumps(js)
+                self._codec.dumps(js)
             )
         else:
             self._logger.warning('request failed - not subscribed to public feed')
 
     async def send_private(self, js: dict):
+        await self.send_private_frame(self._codec.dumps(js))
+
+    async def send_private_frame(self, frame: str):
+        """
+        sends an already encoded message on the private socket
+        """
         if self._websocket_private:
-            await self._websocket_private.send(
-                json.dumps(js)
-            )
+            await self._websocket_private.send(frame)
         else:
             self._logger.warning('request failed - not subscribed to private feed')
 
-    async def on_message(self, message: str) -> None:
-        match message[0]:
-            case '[':
-                js_list: List[Any] = json.loads(message)
-                md_update: str = js_list[-2]
-                order_update: str = js_list[1]
-                if md_update in ('book-10', 'book-25', 'book-100', 'book-500', 'book-1000'):
-                    if 'a' in js_list[1] or 'b' in js_list[1]:
-                        await self.on_book(js_list)
-                    else:
-                        await self.on_book_snapshot(js_list)
-
-                elif md_update == 'trade':
-                    await self.on_trade_(js_list)
-
-                elif md_update == 'spread':
-                    await self.on_spread_(js_list)
+    async def on_message(self, message: Union[str, bytes], receive_ns: int = 0) -> None:
+        self._receive_ns = receive_ns
+        js: Any = self._codec.loads(message)
+        await self._on_js(js)
+        if self.latency:
+            self.latency.on_handled(self._message_type(js), receive_ns)
 
-                elif md_update in ('ohlc-1', 'ohlc-5', 'ohlc-15', 'ohlc-30', 'ohlc-60'):
-                    await self.on_ohlc_(js_list)
+    async def on_messages(self, messages: List[Union[str, bytes]], receive_ns: int = 0) -> None:
+        """
+        conflates consecutive book updates per channel: every pending delta is applied in order through one
+        on_book call, other messages are dispatched in order after flushing the book updates before them
+        """
+        self._receive_ns = receive_ns
+        pending: Dict[int, List[Any]] = {}
+        for message in messages:
+            js: Any = self._codec.loads(message)
+            if type(js) is list and js[-2].startswith('book-') and ('a' in js[1] or 'b' in js[1]):
+                conflated: Optional[List[Any]] = pending.get(js[0])
+                if conflated is None:
+                    pending[js[0]] = conflated = [js[0], {'a': [], 'b': []}, js[-2], js[-1]]
+                else:
+                    self.conflated_frames += 1
+                for payload in js[1:-2]:
+                    conflated[1]['a'].extend(payload.get('a', ()))
+                    conflated[1]['b'].extend(payload.get('b', ()))
+                    if 'c' in payload:
+                        # the checksum of the last delta covers the conflated book
+                        conflated[1]['c'] = payload['c']
+            else:
+                await self._flush_conflated(pending)
+                await self._on_js(js)
+                if self.latency:
+                    self.latency.on_handled(self._message_type(js), receive_ns)
+
+        await self._flush_conflated(pending)
+
+    async def _flush_conflated(self, pending: Dict[int, List[Any]]) -> None:
+        for conflated in pending.values():
+            await self._on_channel_message(conflated)
+            if self.latency:
+                self.latency.on_handled(conflated[-2], self._receive_ns)
+        pending.clear()
 
-                elif md_update == 'ticker':
-                    await self.on_ticker_(js_list)
+    @staticmethod
+    def _message_type(js: Any) -> str:
+        if type(js) is list:
+            return js[-2]
+        if type(js) is dict:
+            return js.get('event', 'unknown')
+        return 'unknown'
 
-                elif order_update == 'openOrders':
-                    await self.on_open_orders(js_list)
+    async def _on_js(self, js: Any) -> None:
+        if type(js) is list:
+            await self._on_channel_message(js)
 
-                elif order_update == 'ownTrades':
-                    await self.on_own_trades(js_list)
+        elif type(js) is dict:
+            match js['event']:
+                case 'heartbeat':
+                    await self.on_heartbeat_(js)
 
-                else:
-                    self._logger.error(f'on_message -> unknown {type(js_list)} message {js_list[1]} -> {js_list}')
+                case 'systemStatus':
+                    await self.on_system_status_(js)
 
-            case '{':
-                js: Dict[Any, Any] = json.loads(message)
-                match js['event']:
-                    case 'heartbeat':
-                        await self.on_heartbeat_(js)
+                case 'subscriptionStatus':
+                    self._on_channel_status(js)
+                    await self.on_subscription_status_(js)
 
-                    case 'systemStatus':
-                        await self.on_system_status_(js)
+                case 'addOrderStatus':
+                    await self.on_add_order_status(js)
 
-                    case 'subscriptionStatus':
-                        await self.on_subscription_status_(js)
+                case 'editOrderStatus':
+                    await self.on_edit_order_status(js)
 
-                    case 'addOrderStatus':
-                        await self.on_add_order_status(js)
+                case 'cancelOrderStatus':
+                    await self.on_cancel_order_status(js)
 
-                    case 'editOrderStatus':
-                        await self.on_edit_order_status(js)
+                case 'batchOrderStatus':
+                    await self.on_batch_order_status(js)
 
-                    case 'cancelOrderStatus':
-                        await self.on_cancel_order_status(js)
+                case 'batchCancelStatus':
+                    await self.on_batch_cancel_status(js)
 
-                    case 'cancelAllStatus':
-                        await self.on_cancel_all_status(js)
+                case 'cancelAllStatus':
+                    await self.on_cancel_all_status(js)
 
-                    case 'cancelAllAfterStatus':
-                        await self.on_cancel_all_after_status_(js)
+                case 'cancelAllOrdersAfterStatus':
+                    await self.on_cancel_all_after_status_(js)
 
-                    case 'pong':
-                        await self.on_pong_(js)
+                case 'pong':
+                    await self.on_pong_(js)
 
-                    case _:
-                        self._logger.error(f'on_message -> unknown {type(js)} message {js}')
+                case _:
+                    self._logger.error(f'on_message -> unknown {type(js)} message {js}')
 
-            case _:
-                self._logger.error(f'on_message -> unknown message {message}')
+        else:
+            self._logger.error(f'on_message -> unknown message {js}')
+
+    async def _on_channel_message(self, js_list: List[Any]) -> None:
+        channel_id: Any = js_list[0]
+        handler: Optional[ChannelHandler] = self._channel_handlers.get(channel_id) if type(channel_id) is int else None
+        if not handler:
+            # public channels are named at [-2], private channels at [1] (same index, 3 items)
+            channel_name: Any = js_list[-2]
+            handler = self._channel_name_handlers.get(channel_name) if type(channel_name) is str else None
+            if not handler:
+                self._logger.error(f'on_message -> unknown {type(js_list)} message {js_list[1]} -> {js_list}')
+                return
+        await handler(js_list)
+
+    def _on_channel_status(self, js: Dict[str, Any]) -> None:
+        channel_id: Optional[int] = js.get('channelID')
+        if channel_id is None:
+            return
+        match js.get('status'):
+            case 'subscribed':
+                channel_name: str = js.get('channelName', '')
+                handler: Optional[ChannelHandler] = self._channel_name_handlers.get(channel_name)
+                if handler and channel_name.startswith('book-'):
+                    # the first frame of a book channel is its snapshot, _on_book_snapshot_message then points
+                    # the channel at on_book so updates are dispatched with one lookup and no payload checks
+                    handler = self._on_book_snapshot_message
+                if handler:
+                    self._channel_handlers[channel_id] = handler
+            case 'unsubscribed':
+                self._channel_handlers.pop(channel_id, None)
+
+    async def _on_book_snapshot_message(self, js_list: List[Any]) -> None:
+        self._channel_handlers[js_list[0]] = self.on_book
+        await self.on_book_snapshot(js_list)
+
+    async def _on_book_message(self, js_list: List[Any]) -> None:
+        if 'a' in js_list[1] or 'b' in js_list[1]:
+            await self.on_book(js_list)
+        else:
+            await self.on_book_snapshot(js_list)
 
     @staticmethod
     def _warn_not_implemented(f):
@@ -205,6 +406,10 @@ class KrakAppBase(WebsocketHandler):
 
     async def on_heartbeat_(self, heartbeat: dict) -> None: ...
 
+    async def on_connection_lost_(self, is_private: bool) -> None: ...
+
+    async def on_connection_restored_(self, is_private: bool) -> None: ...
+
     @_warn_not_implemented
     async def on_book_snapshot(self, snapshot: list) -> None: ...
 
@@ -247,39 +452,67 @@ class KrakAppBase(WebsocketHandler):
     @_warn_not_implemented
     async def on_cancel_order_status(self, status: dict) -> None: ...
 
+    @_warn_not_implemented
+    async def on_batch_order_status(self, status: dict) -> None: ...
+
+    @_warn_not_implemented
+    async def on_batch_cancel_status(self, status: dict) -> None: ...
+
     @_warn_not_implemented
     async def on_cancel_all_status(self, status: dict) -> None: ...
 
     @_warn_not_implemented
     async def on_cancel_all_after_status_(self, status: dict) -> None: ...
 
-    def _get_token(self) -> str:
-        import time
-        from requests import post
-        data: dict = {
-            'nonce': str(int(1000*time.time()))
-        }
-        headers: dict = {
+    def _nonce(self) -> str:
+        # strictly increasing even for requests made within the same millisecond
+        self._last_nonce = max(self._last_nonce + 1, int(1000 * time.time()))
+        return str(self._last_nonce)
+
+    async def private_request(self, method: str, data: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        signed POST to /0/private/<method>
+        :return: the result of the response, raises KrakenApiError when kraken reports errors
+        """
+        if not self._rest or not self._key or not self._secret:
+            raise RuntimeError(f'{method} failed - no http url, key or secret given')
+        uri: str = f'/0/private/{method}'
+        post_data: Dict[str, Any] = {'nonce': self._nonce(), **(data or {})}
+        headers: Dict[str, str] = {
             'API-Key': self._key,
-            'API-Sign': self._get_signature(data)
+            'API-Sign': self._get_signature(uri, post_data)
         }
-        js: dict = post(
-            self._http_url + self._http_uri,
-            headers=headers,
-            data=data
-        ).json()
-        token: str = js['result']['token']
+        return self._result(uri, await self._rest.post(uri, post_data, headers))
+
+    async def public_request(self, method: str, params: Optional[Dict[str, Any]] = None) -> Any:
+        """
+        GET /0/public/<method>
+        :return: the result of the response, raises KrakenApiError when kraken reports errors
+        """
+        if not self._rest:
+            raise RuntimeError(f'{method} failed - no http url given')
+        uri: str = f'/0/public/{method}'
+        return self._result(uri, await self._rest.get(uri, params))
+
+    @staticmethod
+    def _result(uri: str, js: Dict[str, Any]) -> Any:
+        if js.get('error'):
+            raise KrakenApiError(uri, js['error'])
+        return js['result']
+
+    async def _get_token(self) -> str:
+        token: str = (await self.private_request('GetWebSocketsToken'))['token']
         return token
 
-    def _get_signature(self, post_data: dict) -> str:
+    def _get_signature(self, uri: str, post_data: dict) -> str:
         import hmac
-        import urllib
+        import urllib.parse
         from base64 import b64decode, b64encode
         from hashlib import sha256, sha512
         postdata: str = urllib.parse.urlencode(post_data)
         encoded: bytes = (str(post_data['nonce']) + postdata).encode()
-        message = self._http_uri.encode() + sha256(encoded).digest()
+        message = uri.encode() + sha256(encoded).digest()
 
-        mac = hmac.new(b64decode(self._secret), message, sha512)
+        mac = hmac.new(b64decode(self._secret), message, sha512)  # type: ignore
         sigdigest: bytes = b64encode(mac.digest())
         return sigdigest.decode()
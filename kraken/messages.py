@@ -1,28 +1,28 @@
 import sys
 from typing import Optional, Final, Dict, List, Any
-from dataclasses import dataclass, field, InitVar
+from dataclasses import dataclass
 
 from common import (
     Pool,
     Quote,
     Trade,
+    quotePool,
     PooledObject
 )
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class OrderStatus:
-    _js: InitVar[dict]
-    event: str = field(init=False)
-    status: str = field(init=False)
+    event: str
+    status: str
 
-    descr: Optional[str] = field(init=False)
-    reqid: int = field(init=False)
-    txid: Optional[str] = field(init=False)
-    originaltxid: Optional[str] = field(init=False)
-    errorMessage: Optional[str] = field(init=False)
+    descr: Optional[str]
+    reqid: int
+    txid: Optional[str]
+    originaltxid: Optional[str]
+    errorMessage: Optional[str]
 
-    def __post_init__(self, _js):
+    def __init__(self, _js):
         self.event = _js.get('event')
         self.status = _js.get('status')
         self.descr = _js.get('descr')
@@ -32,16 +32,47 @@ class OrderStatus:
         self.errorMessage = _js.get('errorMessage')
 
 
-@dataclass
+@dataclass(init=False, slots=True)
+class BatchOrderStatus:
+    event: str
+    status: str
+    reqid: int
+    result: List[Dict[str, Any]]
+    errorMessage: Optional[str]
+
+    def __init__(self, _js):
+        self.event = _js.get('event')
+        self.status = _js.get('status')
+        self.reqid = int(_js.get('reqid'))
+        self.result = _js.get('result') or []
+        self.errorMessage = _js.get('errorMessage')
+
+
+@dataclass(init=False, slots=True)
+class BatchCancelStatus:
+    event: str
+    status: str
+    reqid: int
+    count: Optional[int]
+    errorMessage: Optional[str]
+
+    def __init__(self, _js):
+        self.event = _js.get('event')
+        self.status = _js.get('status')
+        self.reqid = int(_js.get('reqid'))
+        self.count = _js.get('count')
+        self.errorMessage = _js.get('errorMessage')
+
+
+@dataclass(init=False, slots=True)
 class CancelAllStatus:
-    _js: InitVar[dict]
-    event: str = field(init=False)
-    count: int = field(init=False)
-    status: str = field(init=False)
-    reqid: int = field(init=False)
-    errorMessage: str = field(init=False)
-
-    def __post_init__(self, _js):
+    event: str
+    count: int
+    status: str
+    reqid: int
+    errorMessage: str
+
+    def __init__(self, _js):
         self.event = _js.get('event')
         self.count = _js.get('count')
         self.status = _js.get('status')
@@ -49,12 +80,12 @@ class CancelAllStatus:
         self.errorMessage = _js.get('errorMessage')
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class BookUpdate(PooledObject):
     channelID: int
-    _quotes: InitVar[Dict[str, List[Any]]]
-    b: List[Quote] = field(init=False)
-    a: List[Quote] = field(init=False)
+    b: List[Quote]
+    a: List[Quote]
+    checksum: Optional[str]
     channelName: str
     pair: str
 
@@ -62,104 +93,135 @@ class BookUpdate(PooledObject):
     def create_empty():
         return BookUpdate(-sys.maxsize, {'b': [], 'a': []}, '', '')
 
+    def __init__(self, channelID, _quotes, channelName, pair):
+        self.channelID = channelID
+        self.b = []
+        self.a = []
+        self.checksum = None
+        self._crack(_quotes)
+        self.channelName = channelName
+        self.pair = pair
+
     def init(self, _channelID, quotes, _channelName, pair):
         self.channelID = _channelID
-        self.__post_init__(quotes)
+        self._crack(quotes)
         self.channelName = _channelName
         self.pair = pair
         return self
 
     def clean(self):
         self.channelID = -sys.maxsize
-        self.b = []
-        self.a = []
+        for quote in self.b:
+            quotePool.release(quote)
+        for quote in self.a:
+            quotePool.release(quote)
+        self.b.clear()
+        self.a.clear()
+        self.checksum = None
         self.channelName = ''
         self.pair = ''
 
-    def __post_init__(self, _quotes):
+    def _crack(self, _quotes):
         bids = _quotes.get('b')
         asks = _quotes.get('a')
-        self.b = [Quote(q[0], q[1], q[2]) for q in bids] if bids else []
-        self.a = [Quote(q[0], q[1], q[2]) for q in asks] if asks else []
+        self.checksum = _quotes.get('c')
+        if bids:
+            self.b.extend([quotePool.acquire().init(q[0], q[1], q[2]) for q in bids])
+        if asks:
+            self.a.extend([quotePool.acquire().init(q[0], q[1], q[2]) for q in asks])
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class BookSnapshot:
-    @dataclass
+    @dataclass(init=False, slots=True)
     class _Snapshot:
-        _bids: InitVar[List[Any]]
-        _asks: InitVar[List[Any]]
-        bs: List[Quote] = field(init=False)
-        as_: List[Quote] = field(init=False)
+        bs: List[Quote]
+        as_: List[Quote]
 
-        def __post_init__(self, _bids, _asks):
+        def __init__(self, _bids, _asks):
             self.bs = BookSnapshot._Snapshot._crack(_bids)
             self.as_ = BookSnapshot._Snapshot._crack(_asks)
 
         @staticmethod
         def _crack(_quotes: List[Any]) -> List[Quote]:
-            return [Quote(q[0], q[1], q[2]) for q in _quotes]
+            return [quotePool.acquire().init(q[0], q[1], q[2]) for q in _quotes]
+
+        def clean(self) -> None:
+            for quote in self.bs:
+                quotePool.release(quote)
+            for quote in self.as_:
+                quotePool.release(quote)
+            self.bs.clear()
+            self.as_.clear()
 
     channelID: int
-    _snapshot: InitVar[Dict[str, Any]]
-    snapshot: _Snapshot = field(init=False)
+    snapshot: _Snapshot
     channelName: str
     pair: str
 
-    def __post_init__(self, _snapshot):
+    def __init__(self, channelID, _snapshot, channelName, pair):
+        self.channelID = channelID
         self.snapshot = BookSnapshot._Snapshot(
             _snapshot['bs'] or [],
             _snapshot['as'] or []
         )
+        self.channelName = channelName
+        self.pair = pair
+
+    def clean(self) -> None:
+        """
+        returns the snapshot quotes to the quote pool
+        """
+        self.snapshot.clean()
 
 
-@dataclass
+@dataclass(slots=True)
 class Ticker:
-    @dataclass
+    @dataclass(slots=True)
     class _Quote:
         price: float
         wholeLotVolume: int
         lotVolume: float
 
-    @dataclass
+    @dataclass(slots=True)
     class _DailyPriceDiff:
         today: float
         last24Hours: float
 
-    @dataclass
+    @dataclass(slots=True)
     class Ask(_Quote):
         ...
 
-    @dataclass
+    @dataclass(slots=True)
     class Bid(_Quote):
         ...
 
-    @dataclass
+    @dataclass(slots=True)
     class Close:
         price: float
         lotVolume: float
 
-    @dataclass
+    @dataclass(slots=True)
     class Volume(_DailyPriceDiff):
         ...
 
-    @dataclass
+    @dataclass(slots=True)
     class Price(_DailyPriceDiff):
         ...
 
-    @dataclass
+    @dataclass(slots=True)
     class NumberOfTrades(_DailyPriceDiff):
         ...
 
-    @dataclass
+    @dataclass(slots=True)
     class LowPrice(_DailyPriceDiff):
         ...
 
-    @dataclass
+    @dataclass(slots=True)
     class HighPrice(_DailyPriceDiff):
         ...
 
-    @dataclass
+    @dataclass(slots=True)
     class OpenPrice(_DailyPriceDiff):
         ...
 
@@ -174,35 +236,35 @@ class Ticker:
     o: OpenPrice
 
 
-@dataclass
+@dataclass(slots=True)
 class Event:
     event: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Heartbeat(Event):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Ping(Event):
     ...
 
 
-@dataclass
+@dataclass(slots=True)
 class Pong(Event):
     reqid: int
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class TickerPayload:
     channelID: str
-    _js: InitVar[dict]
-    ticker: Ticker = field(init=False)
+    ticker: Ticker
     channelName: str
     pair: str
 
-    def __post_init__(self, _js: dict):
+    def __init__(self, channelID, _js: dict, channelName, pair):
+        self.channelID = channelID
         self.ticker = Ticker(
             Ticker.Ask(*_js['a']),
             Ticker.Bid(*_js['b']),
@@ -214,33 +276,35 @@ class TickerPayload:
             Ticker.HighPrice(*_js['h']),
             Ticker.OpenPrice(*_js['o'])
         )
+        self.channelName = channelName
+        self.pair = pair
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class TradePayload:
     channelID: int
-    _trades: InitVar[List[Any]]
-    trades: List[Trade] = field(init=False)
+    trades: List[Trade]
     channelName: str
     pair: str
 
-    def __post_init__(self, _trades):
+    def __init__(self, channelID, _trades, channelName, pair):
+        self.channelID = channelID
         self.trades = [Trade(t[0], t[1], t[2], t[3], t[4]) for t in _trades]
+        self.channelName = channelName
+        self.pair = pair
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class SubscriptionStatus:
-    subscription: Dict[str, str] = field(init=False)
-    channelName: Optional[str] = field(init=False)
-    event: Optional[str] = field(init=False)
-    pair: Optional[List[str]] = field(init=False)
-    status: Optional[str] = field(init=False)
-    channelID: Optional[int] = field(init=False)
-    errorMessage: Optional[str] = field(init=False)
-
-    _js: InitVar[dict]
-
-    def __post_init__(self, _js):
+    subscription: Dict[str, str]
+    channelName: Optional[str]
+    event: Optional[str]
+    pair: Optional[List[str]]
+    status: Optional[str]
+    channelID: Optional[int]
+    errorMessage: Optional[str]
+
+    def __init__(self, _js):
         self.subscription = _js.get('subscription')
         self.channelName = self.subscription.get('name')
         self.event = _js.get('event')
@@ -250,7 +314,7 @@ class SubscriptionStatus:
         self.errorMessage = _js.get('errorMessage')
 
 
-@dataclass
+@dataclass(slots=True)
 class SystemStatus:
     connectionID: int
     event: str
@@ -258,7 +322,7 @@ class SystemStatus:
     version: str
 
 
-@dataclass
+@dataclass(slots=True)
 class Candle:
     time: float
     etime: float
@@ -271,29 +335,30 @@ class Candle:
     count: int
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class Ohlc:
     channelID: int
-    _candle: InitVar[List[Any]]
-    candle: Candle = field(init=False)
+    candle: Candle
     channelName: str
     pair: str
 
-    def __post_init__(self, _candle):
+    def __init__(self, channelID, _candle, channelName, pair):
+        self.channelID = channelID
         self.candle = Candle(*_candle)
+        self.channelName = channelName
+        self.pair = pair
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class CancelAllOrdersAfterStatus:
-    _js: InitVar[dict]
-    event: str = field(init=False)
-    status: str = field(init=False)
-    currentTime: str = field(init=False)
-    triggerTime: str = field(init=False)
-    reqid: Optional[int] = field(init=False)
-    errorMessage: Optional[str] = field(init=False)
-
-    def __post_init__(self, _js):
+    event: str
+    status: str
+    currentTime: str
+    triggerTime: str
+    reqid: Optional[int]
+    errorMessage: Optional[str]
+
+    def __init__(self, _js):
         self.event = _js.get('event')
         self.status = _js.get('status')
         self.currentTime = _js.get('currentTime')
@@ -302,7 +367,7 @@ class CancelAllOrdersAfterStatus:
         self.errorMessage = _js.get('errorMessage')
 
 
-@dataclass
+@dataclass(slots=True)
 class Spread:
     bid: float
     ask: float
@@ -311,16 +376,18 @@ class Spread:
     askVolume: float
 
 
-@dataclass
+@dataclass(init=False, slots=True)
 class SpreadPayload:
     channelID: int
-    _spread: InitVar[dict]
-    spread: Spread = field(init=False)
+    spread: Spread
     channelName: str
     pair: str
 
-    def __post_init__(self, _spread):
+    def __init__(self, channelID, _spread, channelName, pair):
+        self.channelID = channelID
         self.spread = Spread(*_spread)
+        self.channelName = channelName
+        self.pair = pair
 
 
-bookUpdatePool: Final[Pool] = Pool(128, BookUpdate.create_empty)
+bookUpdatePool: Final[Pool[BookUpdate]] = Pool(128, BookUpdate.create_empty)
@@ -0,0 +1,168 @@
+import json
+from typing import (
+    Optional,
+    Tuple,
+    Dict,
+    List
+)
+
+from common import Order, Side
+from .symbol_config import SymbolConfig, SymbolConfigMap
+
+
+# distinct prices / volumes kept per symbol before their rendered strings are dropped
+MAX_RENDERED: int = 4096
+
+
+class RenderedValues:
+    """
+    price and volume strings of a symbol, rendered by the symbol config once per distinct value
+        - only values format_price / format_volume accepted are kept, a bad value raises on every call
+        - each cache is cleared once it holds MAX_RENDERED values, prices drift over a session
+    """
+    __slots__ = ('symbol_config', 'prices', 'volumes')
+
+    def __init__(self, symbol_config: Optional[SymbolConfig]):
+        self.symbol_config = symbol_config
+        self.prices: Dict[float, str] = {}
+        self.volumes: Dict[float, str] = {}
+
+    def price(self, price: float) -> str:
+        rendered: Optional[str] = self.prices.get(price)
+        if rendered is None:
+            rendered = self.symbol_config.format_price(price) if self.symbol_config else str(price)
+            if len(self.prices) >= MAX_RENDERED:
+                self.prices.clear()
+            self.prices[price] = rendered
+        return rendered
+
+    def volume(self, volume: float) -> str:
+        rendered: Optional[str] = self.volumes.get(volume)
+        if rendered is None:
+            rendered = self.symbol_config.format_volume(volume) if self.symbol_config else str(volume)
+            if len(self.volumes) >= MAX_RENDERED:
+                self.volumes.clear()
+            self.volumes[volume] = rendered
+        return rendered
+
+
+class OrderTemplate:
+    """
+    a pre-rendered order frame up to its first variable field, with the rendered values of its symbol
+    """
+    __slots__ = ('head', 'price', 'volume')
+
+    def __init__(self, head: str, values: RenderedValues):
+        self.head = head
+        self.price = values.price
+        self.volume = values.volume
+
+
+class OrderEncoder:
+    """
+    builds addOrder, editOrder, cancelOrder, batchOrder and batchCancel frames from pre-rendered templates
+        - the static fields (event, token, pair, type, ordertype, timeinforce) are rendered once per symbol, side
+          and order type, only price, volume, order id and reqid are spliced into the frame
+        - price and volume strings are rendered once per symbol and distinct value (see RenderedValues)
+        - templates embed the private token, they are dropped when a different token is passed (reconnect)
+        - the frames are the same json documents KrakApp used to build as dicts, field order aside
+    """
+    def __init__(self) -> None:
+        self._token: Optional[str] = None
+        self._add_templates: Dict[Tuple[str, Side, str], OrderTemplate] = {}
+        self._edit_templates: Dict[str, OrderTemplate] = {}
+        self._batch_templates: Dict[Tuple[str, Side, str], OrderTemplate] = {}
+        self._values: Dict[str, RenderedValues] = {}
+        self._cancel_head: str = ''
+        self._batch_order_head: str = ''
+        self._batch_cancel_head: str = ''
+
+    def _set_token(self, token: Optional[str]) -> None:
+        self._token = token
+        self._add_templates.clear()
+        self._edit_templates.clear()
+        self._cancel_head = json.dumps({'event': 'cancelOrder', 'token': token})[:-1] + ',"txid":["'
+        self._batch_order_head = json.dumps({'event': 'batchOrder', 'token': token})[:-1] + ',"data":['
+        self._batch_cancel_head = json.dumps({'event': 'batchCancel', 'token': token})[:-1] + ',"orders":["'
+
+    def _rendered_values(self, symbol: str) -> RenderedValues:
+        values: Optional[RenderedValues] = self._values.get(symbol)
+        if values is None:
+            values = self._values[symbol] = RenderedValues(SymbolConfigMap.get(symbol))
+        return values
+
+    @staticmethod
+    def _head(static: dict, first_field: str) -> str:
+        return f'{json.dumps(static)[:-1]},"{first_field}":"'
+
+    def _add_template(self, order: Order) -> OrderTemplate:
+        key: Tuple[str, Side, str] = (order.symbol, order.side, order.order_type)
+        template: Optional[OrderTemplate] = self._add_templates.get(key)
+        if template is None:
+            template = self._add_templates[key] = OrderTemplate(
+                self._head({'event': 'addOrder', 'token': self._token, **self._order_fields(order)}, 'price'),
+                self._rendered_values(order.symbol)
+            )
+        return template
+
+    def _batch_template(self, order: Order) -> OrderTemplate:
+        key: Tuple[str, Side, str] = (order.symbol, order.side, order.order_type)
+        template: Optional[OrderTemplate] = self._batch_templates.get(key)
+        if template is None:
+            template = self._batch_templates[key] = OrderTemplate(
+                self._head(self._order_fields(order), 'price'),
+                self._rendered_values(order.symbol)
+            )
+        return template
+
+    @staticmethod
+    def _order_fields(order: Order) -> dict:
+        return {
+            'pair': order.symbol,
+            'type': 'buy' if order.side == Side.BUY else 'sell',
+            'ordertype': order.order_type,
+            'timeinforce': 'GTC'
+        }
+
+    def _edit_template(self, symbol: str) -> OrderTemplate:
+        template: Optional[OrderTemplate] = self._edit_templates.get(symbol)
+        if template is None:
+            template = self._edit_templates[symbol] = OrderTemplate(
+                self._head({'event': 'editOrder', 'token': self._token, 'pair': symbol}, 'orderid'),
+                self._rendered_values(symbol)
+            )
+        return template
+
+    def new_order(self, token: Optional[str], order: Order, req_id: int) -> str:
+        if token is not self._token or not self._cancel_head:
+            self._set_token(token)
+        template: OrderTemplate = self._add_template(order)
+        return f'{template.head}{template.price(order.price)}","volume":"{template.volume(order.qty)}",' \
+               f'"reqid":{req_id}}}'
+
+    def replace_order(self, token: Optional[str], order: Order, price: float, qty: float, req_id: int) -> str:
+        if token is not self._token or not self._cancel_head:
+            self._set_token(token)
+        template: OrderTemplate = self._edit_template(order.symbol)
+        return f'{template.head}{order.order_id}","price":"{template.price(price)}",' \
+               f'"volume":"{template.volume(qty)}","reqid":{req_id}}}'
+
+    def cancel_order(self, token: Optional[str], order: Order, req_id: int) -> str:
+        if token is not self._token or not self._cancel_head:
+            self._set_token(token)
+        return f'{self._cancel_head}{order.order_id}"],"reqid":{req_id}}}'
+
+    def batch_order(self, token: Optional[str], orders: List[Order], req_id: int) -> str:
+        if token is not self._token or not self._cancel_head:
+            self._set_token(token)
+        items: List[str] = []
+        for order in orders:
+            template: OrderTemplate = self._batch_template(order)
+            items.append(f'{template.head}{template.price(order.price)}","volume":"{template.volume(order.qty)}"}}')
+        return f'{self._batch_order_head}{",".join(items)}],"reqid":{req_id}}}'
+
+    def batch_cancel(self, token: Optional[str], orders: List[Order], req_id: int) -> str:
+        if token is not self._token or not self._cancel_head:
+            self._set_token(token)
+        order_ids: str = '","'.join([str(order.order_id) for order in orders])
+        return f'{self._batch_cancel_head}{order_ids}"],"reqid":{req_id}}}'
@@ -0,0 +1,109 @@
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Tuple, Union
+
+
+def _fixed_point(increment: float) -> Tuple[int, int]:
+    """
+    splits an increment into (multiplier, decimal places) so that increment == multiplier * 10 ** -places
+    """
+    exponent = Decimal(str(increment)).normalize().as_tuple().exponent
+    places: int = -exponent if isinstance(exponent, int) and exponent < 0 else 0
+    multiplier: int = int(Decimal(str(increment)).scaleb(places))
+    return multiplier, places
+
+
+# a float within this many units of an integer is on the grid, float error on exchange prices is ~1e-12 units
+GRID_TOLERANCE: float = 1e-6
+
+
+def _units(value: Union[str, float], increment: Decimal, per_unit: float, name: str) -> int:
+    """
+    exact number of increments in value, strings are parsed as decimals, floats checked against GRID_TOLERANCE
+    :raises ValueError: if value is not a number or not a multiple of increment
+    """
+    if isinstance(value, str):
+        try:
+            units: Decimal = Decimal(value) / increment
+        except (InvalidOperation, ZeroDivisionError):
+            raise ValueError(f'invalid {name} {value!r}')
+        if not units.is_finite() or units != units.to_integral_value():
+            raise ValueError(f'{name} {value} is not a multiple of {increment}')
+        return int(units)
+    scaled: float = value * per_unit
+    rounded: int = round(scaled)
+    if abs(scaled - rounded) > GRID_TOLERANCE:
+        raise ValueError(f'{name} {value} is not a multiple of {increment}')
+    return rounded
+
+
+def _format(units: int, multiplier: int, places: int) -> str:
+    scaled: int = units * multiplier
+    sign: str = '-' if scaled < 0 else ''
+    whole, fraction = divmod(abs(scaled), 10 ** places)
+    if not places:
+        return f'{sign}{whole}'
+    return f'{sign}{whole}.{fraction:0{places}d}'
+
+
+class SymbolConfig:
+    """
+    static symbol reference data
+        - prices are integer multiples of tick_size and volumes integer multiples of minimum_lot_size
+        - to_ticks / to_lots give the exact integer representation of an exchange price or volume (str or float),
+          strings are parsed exactly and a value off the tick / lot grid raises ValueError instead of being rounded
+        - format_price / format_volume render exact decimal strings for order messages without str(float),
+          they also reject zero and negative values so the order sent is always the order requested
+    """
+    def __init__(self, name: str, ccy: str, tick_size: float, minimum_lot_size: float):
+        self.name = name
+        self.ccy = ccy
+        self.tick_size = tick_size
+        self.minimum_lot_size = minimum_lot_size
+
+        self._ticks_per_unit: float = 1 / tick_size
+        self._lots_per_unit: float = 1 / minimum_lot_size
+        self._tick: Decimal = Decimal(str(tick_size))
+        self._lot: Decimal = Decimal(str(minimum_lot_size))
+        self._tick_multiplier, self._tick_places = _fixed_point(tick_size)
+        self._lot_multiplier, self._lot_places = _fixed_point(minimum_lot_size)
+
+    def to_ticks(self, price: Union[str, float]) -> int:
+        return _units(price, self._tick, self._ticks_per_unit, 'price')
+
+    def to_lots(self, volume: Union[str, float]) -> int:
+        return _units(volume, self._lot, self._lots_per_unit, 'volume')
+
+    def from_ticks(self, ticks: int) -> float:
+        return ticks / self._ticks_per_unit
+
+    def from_lots(self, lots: int) -> float:
+        return lots / self._lots_per_unit
+
+    def format_ticks(self, ticks: int) -> str:
+        return _format(ticks, self._tick_multiplier, self._tick_places)
+
+    def format_lots(self, lots: int) -> str:
+        return _format(lots, self._lot_multiplier, self._lot_places)
+
+    def format_price(self, price: Union[str, float]) -> str:
+        ticks: int = self.to_ticks(price)
+        if ticks <= 0:
+            raise ValueError(f'price {price} must be positive')
+        return self.format_ticks(ticks)
+
+    def format_volume(self, volume: Union[str, float]) -> str:
+        lots: int = self.to_lots(volume)
+        if lots <= 0:
+            raise ValueError(f'volume {volume} must be at least {self._lot}')
+        return self.format_lots(lots)
+
+
+SymbolConfigMap: Dict[str, SymbolConfig] = {
+    'XBT/USD': SymbolConfig('XBT/USD', 'USD', 0.1, 0.0001),
+    'ETH/USD': SymbolConfig('ETH/USD', 'USD', 0.01, 0.01),
+    'USDT/EUR': SymbolConfig('USDT/EUR', 'EUR', 0.0001, 0.0001),
+    'NANO/USD': SymbolConfig('NANO/USD', 'USD', 0.0001, 0.0001),
+    'ATOM/USD': SymbolConfig('ATOM/USD', 'USD', 0.0001, 0.01),
+    'DOT/USD': SymbolConfig('DOT/USD', 'USD', 0.0001, 0.01),
+    'EUR/USD': SymbolConfig('EUR/USD', 'USD', 0.0001, 0.0001)
+}
@@ -0,0 +1,15 @@
+from app.bar_builder import BarSeries
+from kraken import Candle
+
+
+def test_out_of_order_trade_keeps_close():
+    bars: BarSeries = BarSeries(60)
+    bars.update(100.0, 1.0, 10)
+    bars.update(101.0, 1.0, 20)
+    bars.update(99.0, 1.0, 15)
+    current = bars.current()
+    assert isinstance(current, Candle)
+    assert current.close == 101.0
+    assert float(current.time) == 20
+    assert current.low == 99.0
+    assert current.volume == 3.0
@@ -0,0 +1,115 @@
+import zlib
+from typing import List
+
+from kraken import Book, BookSnapshot, BookUpdate, SymbolConfigMap
+
+PAIR: str = 'XBT/USD'
+
+
+def _snapshot(depth: int = 10, mid: float = 20000.0, tick: float = 0.2) -> BookSnapshot:
+    bids: List[List[str]] = [[f'{mid - tick * (x + 1):.5f}', '1.00000000', '0'] for x in range(depth)]
+    asks: List[List[str]] = [[f'{mid + tick * (x + 1):.5f}', '1.00000000', '0'] for x in range(depth)]
+    return BookSnapshot(0, {'bs': bids, 'as': asks}, f'book-{depth}', PAIR)
+
+
+def _update(bids=(), asks=(), checksum=None) -> BookUpdate:
+    quotes: dict = {
+        'b': [[price, volume, '0'] for price, volume in bids],
+        'a': [[price, volume, '0'] for price, volume in asks]
+    }
+    if checksum is not None:
+        quotes['c'] = checksum
+    return BookUpdate(0, quotes, 'book-10', PAIR)
+
+
+def _books() -> List[Book]:
+    return [Book(_snapshot()), Book(_snapshot(), symbol_config=SymbolConfigMap[PAIR])]
+
+
+def test_snapshot_levels_best_first():
+    for book in _books():
+        assert book.depth == 10
+        assert [q.price for q in book.bids] == [round(20000.0 - 0.2 * (x + 1), 5) for x in range(10)]
+        assert [q.price for q in book.asks] == [round(20000.0 + 0.2 * (x + 1), 5) for x in range(10)]
+        assert book.best_bid().price == 19999.8
+        assert book.best_ask().price == 20000.2
+        assert book.mid() == 20000.0
+
+
+def test_update_volume_in_place():
+    for book in _books():
+        bids: list = book.bids
+        book.update(_update(bids=[('19999.80000', '2.50000000')]))
+        assert book.best_bid().volume == 2.5
+        assert book.bids is bids
+        assert len(book.bids) == 10
+
+
+def test_insert_better_level_trims_depth():
+    for book in _books():
+        book.update(_update(asks=[('20000.10000', '0.50000000')]))
+        assert book.best_ask().price == 20000.1
+        assert book.best_ask().volume == 0.5
+        assert len(book.asks) == 10
+        assert book.asks[-1].price == 20001.8
+
+
+def test_insert_beyond_depth_ignored():
+    for book in _books():
+        book.update(_update(bids=[('19990.00000', '1.00000000')]))
+        assert len(book.bids) == 10
+        assert book.bids[-1].price == 19998.0
+
+
+def test_delete_level():
+    for book in _books():
+        book.update(_update(bids=[('19999.80000', '0.00000000')], asks=[('20000.60000', '0.00000000')]))
+        assert book.best_bid().price == 19999.6
+        assert len(book.bids) == 9
+        assert [q.price for q in book.asks[:3]] == [20000.2, 20000.4, 20000.8]
+
+
+def test_delete_unknown_level_ignored():
+    for book in _books():
+        book.update(_update(asks=[('20001.10000', '0.00000000')]))
+        assert len(book.asks) == 10
+
+
+def test_clear():
+    book: Book = Book(_snapshot())
+    book.clear()
+    assert book.bids == [] and book.asks == []
+    assert book.mid() is None
+
+
+def _kraken_checksum(asks: List[List[str]], bids: List[List[str]]) -> str:
+    data: str = ''
+    for price, volume in asks[:10] + bids[:10]:
+        data += price.replace('.', '').lstrip('0') + volume.replace('.', '').lstrip('0')
+    return str(zlib.crc32(data.encode()))
+
+
+def test_checksum_matches_feed_strings():
+    for book in _books():
+        asks: List[List[str]] = [[f'{20000.0 + 0.2 * (x + 1):.5f}', '1.00000000'] for x in range(10)]
+        bids: List[List[str]] = [[f'{20000.0 - 0.2 * (x + 1):.5f}', '1.00000000'] for x in range(10)]
+        assert book.checksum(5) == _kraken_checksum(asks, bids)
+
+        book.update(_update(bids=[('19999.80000', '0.00000000')], asks=[('20000.10000', '0.01230000')]))
+        asks = [['20000.10000', '0.01230000']] + asks[:9]
+        bids = bids[1:]
+        assert book.checksum(5) == _kraken_checksum(asks, bids)
+
+
+def test_checksum_detects_divergence():
+    book: Book = Book(_snapshot())
+    expected: str = book.checksum(5)
+    book.update(_update(asks=[('20000.20000', '1.00000001')]))
+    assert book.checksum(5) != expected
+
+
+def test_update_carries_checksum():
+    update: BookUpdate = _update(bids=[('19999.80000', '2.00000000')], checksum='123')
+    assert update.checksum == '123'
+    update.clean()
+    assert update.checksum is None
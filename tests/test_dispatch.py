@@ -0,0 +1,58 @@
+import asyncio
+from typing import Any, List, Tuple
+
+from kraken.krak_app_base import KrakAppBase
+
+STATUS: dict = {'channelID': 336, 'channelName': 'book-10', 'event': 'subscriptionStatus', 'status': 'subscribed'}
+SNAPSHOT: List[Any] = [336, {'as': [['20000.1', '1.0', '0']], 'bs': [['19999.9', '1.0', '0']]}, 'book-10', 'XBT/USD']
+UPDATE: List[Any] = [336, {'a': [['20000.1', '2.0', '0']], 'c': '1'}, 'book-10', 'XBT/USD']
+
+
+class RecordingApp(KrakAppBase):
+    def __init__(self):
+        super().__init__()
+        self.calls: List[Tuple[str, Any]] = []
+
+    async def on_book(self, book: list) -> None:
+        self.calls.append(('update', book))
+
+    async def on_book_snapshot(self, snapshot: list) -> None:
+        self.calls.append(('snapshot', snapshot))
+
+    async def on_open_orders(self, orders: list) -> None:
+        self.calls.append(('open_orders', orders))
+
+
+def test_book_channel_snapshot_then_updates():
+    app: RecordingApp = RecordingApp()
+    app._on_channel_status(STATUS)
+
+    async def run() -> None:
+        await app._on_channel_message(SNAPSHOT)
+        await app._on_channel_message(UPDATE)
+        await app._on_channel_message(UPDATE)
+    asyncio.run(run())
+
+    assert [call for call, _ in app.calls] == ['snapshot', 'update', 'update']
+    assert app._channel_handlers[336] == app.on_book
+
+
+def test_resubscribe_expects_a_new_snapshot():
+    app: RecordingApp = RecordingApp()
+    app._on_channel_status(STATUS)
+    asyncio.run(app._on_channel_message(SNAPSHOT))
+    app._on_channel_status(STATUS)
+    asyncio.run(app._on_channel_message(SNAPSHOT))
+    assert [call for call, _ in app.calls] == ['snapshot', 'snapshot']
+
+
+def test_unknown_channel_routed_by_name():
+    app: RecordingApp = RecordingApp()
+
+    async def run() -> None:
+        await app._on_channel_message(SNAPSHOT)
+        await app._on_channel_message(UPDATE)
+        await app._on_channel_message([[{'OUF4EM-FRGI2-MQMWZD': {'status': 'open'}}], 'openOrders', {'sequence': 1}])
+    asyncio.run(run())
+
+    assert [call for call, _ in app.calls] == ['snapshot', 'update', 'open_orders']
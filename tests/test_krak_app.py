@@ -0,0 +1,103 @@
+import asyncio
+from typing import List
+
+import pytest
+
+from common import Order, Side
+from common.websocket_client import WebsocketClient
+from kraken import KrakApp, KrakenApiError
+
+
+class SendingApp(KrakApp):
+    def __init__(self):
+        super().__init__()
+        self._token = 'token'
+        self.frames: List[str] = []
+
+    async def send_private_frame(self, frame: str) -> None:
+        self.frames.append(frame)
+
+
+def _order(order_id=None) -> Order:
+    order: Order = Order('XBT/USD', Side.BUY, 1, 0.0001, 20000.0, 'limit', 'new', 'GTC')
+    order.order_id = order_id
+    return order
+
+
+def test_cancel_without_txid_raises():
+    app: SendingApp = SendingApp()
+    with pytest.raises(ValueError):
+        asyncio.run(app.cancel_order(_order()))
+    assert app.frames == []
+
+
+def test_replace_without_txid_raises():
+    app: SendingApp = SendingApp()
+    with pytest.raises(ValueError):
+        asyncio.run(app.replace_order(_order(), 20000.1, 0.0001))
+    assert app.frames == []
+
+
+def test_cancel_sends_txid():
+    app: SendingApp = SendingApp()
+    asyncio.run(app.cancel_order(_order('OUF4EM-FRGI2-MQMWZD')))
+    assert len(app.frames) == 1
+    assert '"txid":["OUF4EM-FRGI2-MQMWZD"]' in app.frames[0]
+
+
+def test_batch_cancel_without_txid_raises():
+    app: SendingApp = SendingApp()
+    with pytest.raises(ValueError):
+        asyncio.run(app.batch_cancel([_order('OUF4EM-FRGI2-MQMWZD'), _order()]))
+    assert app.frames == []
+    assert app._batch_cancels == {}
+
+
+def test_off_grid_batch_leaves_no_pending_batch():
+    app: SendingApp = SendingApp()
+    orders: List[Order] = [_order(), _order()]
+    orders[1].price = 20000.05
+    with pytest.raises(ValueError):
+        asyncio.run(app.batch_new_orders(orders))
+    assert app.frames == []
+    assert app._batch_orders == {}
+    assert orders[0].clorder_id == 1
+
+
+def test_off_grid_order_leaves_no_pending_ack():
+    async def run() -> None:
+        app: SendingApp = SendingApp()
+        app.enable_ack_timeouts(0.01)
+        order: Order = _order()
+        order.price = 20000.05
+        with pytest.raises(ValueError):
+            await app.new_order_single(order, await_ack=True)
+        await asyncio.sleep(0.05)
+        assert app._pending_acks == {}
+        assert app.frames == []
+        assert order.clorder_id == 1
+    asyncio.run(run())
+
+
+def test_failed_send_drops_pending_ack():
+    class FailingApp(SendingApp):
+        async def send_private_frame(self, frame: str) -> None:
+            raise ConnectionError('closed')
+
+    async def run() -> None:
+        app: FailingApp = FailingApp()
+        app.enable_ack_timeouts(0.01)
+        with pytest.raises(ConnectionError):
+            await app.new_order_single(_order(), await_ack=True)
+        assert app._pending_acks == {}
+    asyncio.run(run())
+
+
+def test_failed_token_refresh_refuses_reconnect():
+    class TokenlessApp(SendingApp):
+        async def _refresh_token(self) -> None:
+            raise KrakenApiError('/0/private/GetWebSocketsToken', ['EService:Unavailable'])
+
+    app: TokenlessApp = TokenlessApp()
+    app._websocket_private = WebsocketClient('ws://127.0.0.1:1', reconnect=True)
+    assert asyncio.run(app.on_reconnect(app._websocket_private)) is False
@@ -0,0 +1,30 @@
+import json
+
+import pytest
+
+from common import Order, Side
+from kraken.order_encoder import MAX_RENDERED, OrderEncoder
+
+TOKEN: str = 'token'
+
+
+def _order(price: float) -> Order:
+    return Order('XBT/USD', Side.BUY, 1, 0.0001, price, 'limit', 'new', 'GTC')
+
+
+def test_rendered_prices_are_reused_and_bounded():
+    encoder: OrderEncoder = OrderEncoder()
+    assert json.loads(encoder.new_order(TOKEN, _order(20000.1), 1))['price'] == '20000.1'
+    assert json.loads(encoder.new_order(TOKEN, _order(20000.1), 2))['price'] == '20000.1'
+    for ticks in range(1, MAX_RENDERED + 2):
+        encoder.new_order(TOKEN, _order(ticks / 10), ticks)
+    assert len(encoder._values['XBT/USD'].prices) <= MAX_RENDERED
+    assert json.loads(encoder.new_order(TOKEN, _order(20000.1), 3))['price'] == '20000.1'
+
+
+def test_rejected_prices_are_not_cached():
+    encoder: OrderEncoder = OrderEncoder()
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            encoder.new_order(TOKEN, _order(20000.05), 1)
+    assert 20000.05 not in encoder._values['XBT/USD'].prices
@@ -0,0 +1,80 @@
+import asyncio
+from typing import List
+
+from app.publisher import Publisher, Subscriber
+from common import Quote, Trade
+
+
+class StalledWebsocket:
+    subprotocol = None
+    remote_address = ('127.0.0.1', 0)
+
+    def __init__(self):
+        self.closed: bool = False
+
+    async def send(self, frame) -> None:
+        await asyncio.Future()
+
+    async def close(self) -> None:
+        self.closed = True
+
+
+class Book:
+    symbol: str = 'XBT/USD'
+    bids: List[Quote] = [Quote(19999.9, 1.0, 0)]
+    asks: List[Quote] = [Quote(20000.1, 1.0, 0)]
+
+
+class Status:
+    event: str = 'addOrderStatus'
+    status: str = 'error'
+    reqid: int = 1
+
+
+TRADE: Trade = Trade(20000.0, 0.1, 0, 'b', 'l')
+
+
+def _subscriber(publisher: Publisher, buffer_size: int) -> Subscriber:
+    sub: Subscriber = Subscriber(StalledWebsocket(), buffer_size)
+    sub.task = asyncio.ensure_future(asyncio.sleep(60))
+    publisher._subs.append(sub)
+    return sub
+
+
+def _topics(sub: Subscriber) -> List[str]:
+    return [str(frame).split('"topic":"')[1].split('"')[0] for _, frame in sub.frames]
+
+
+def test_drop_evicts_conflated_frames_only():
+    async def run() -> None:
+        publisher: Publisher = Publisher('127.0.0.1', 0)
+        sub: Subscriber = _subscriber(publisher, 4)
+        publisher._broadcast('orders', {})
+        publisher._broadcast('book', Book())
+        publisher._broadcast('trade', TRADE)
+        publisher._broadcast('book', Book())
+        publisher._broadcast('order_status', Status())
+        assert _topics(sub) == ['orders', 'trade', 'book', 'order_status']
+        publisher._broadcast('trade', TRADE)
+        assert _topics(sub) == ['orders', 'trade', 'order_status', 'trade']
+        assert sub.dropped == 2
+        sub.task.cancel()  # type: ignore
+    asyncio.run(run())
+
+
+def test_full_of_edge_frames_drops_conflated_then_disconnects():
+    async def run() -> None:
+        publisher: Publisher = Publisher('127.0.0.1', 0)
+        sub: Subscriber = _subscriber(publisher, 2)
+        publisher._broadcast('trade', TRADE)
+        publisher._broadcast('orders', {})
+        publisher._broadcast('book', Book())
+        assert _topics(sub) == ['trade', 'orders']
+        assert sub.dropped == 1
+        assert sub in publisher._subs
+
+        publisher._broadcast('order_status', Status())
+        assert sub not in publisher._subs
+        await asyncio.sleep(0)
+        assert sub.websocket.closed
+    asyncio.run(run())
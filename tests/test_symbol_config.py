@@ -0,0 +1,47 @@
+import pytest
+
+from kraken import SymbolConfig, SymbolConfigMap
+
+XBT: SymbolConfig = SymbolConfigMap['XBT/USD']
+ETH: SymbolConfig = SymbolConfigMap['ETH/USD']
+
+
+def test_to_ticks_exact():
+    assert XBT.to_ticks('20000.1') == 200001
+    assert XBT.to_ticks('20000.10000') == 200001
+    assert XBT.to_ticks(20000.1) == 200001
+    assert ETH.to_ticks(1.23) == 123
+    assert XBT.to_lots('0.0001') == 1
+    assert XBT.to_lots('0') == 0
+
+
+def test_to_ticks_rejects_off_grid():
+    with pytest.raises(ValueError):
+        XBT.to_ticks('20000.05')
+    with pytest.raises(ValueError):
+        XBT.to_ticks(1.23)
+    with pytest.raises(ValueError):
+        XBT.to_lots('0.00005')
+    with pytest.raises(ValueError):
+        XBT.to_ticks('abc')
+
+
+def test_format_exact():
+    assert XBT.format_price('20000.1') == '20000.1'
+    assert XBT.format_price(20000.0) == '20000.0'
+    assert ETH.format_price(1.23) == '1.23'
+    assert XBT.format_volume(0.0001) == '0.0001'
+    assert XBT.format_volume('1.50000000') == '1.5000'
+
+
+def test_format_rejects_changed_order_terms():
+    with pytest.raises(ValueError):
+        XBT.format_price('20000.05')
+    with pytest.raises(ValueError):
+        XBT.format_price(1.23)
+    with pytest.raises(ValueError):
+        XBT.format_volume(0.00001)
+    with pytest.raises(ValueError):
+        XBT.format_volume(0)
+    with pytest.raises(ValueError):
+        XBT.format_price('0')
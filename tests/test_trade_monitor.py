@@ -0,0 +1,17 @@
+from app.trade_monitor import TradeMonitor
+from common import Trade
+from kraken import SymbolConfigMap
+
+
+def test_off_grid_trade_is_bucketed_to_nearest_tick():
+    monitor: TradeMonitor = TradeMonitor(SymbolConfigMap['XBT/USD'], capacity=2)
+    monitor.update(Trade(20000.1, 1.0, 1, 'b', 'l'))
+    monitor.update(Trade(20000.12, 2.0, 2, 's', 'm'))
+    assert monitor.get_aggregate() == {200001: 3.0}
+    assert monitor.volume() == 3.0
+
+    monitor.update(Trade(20000.3, 1.0, 3, 'b', 'l'))
+    monitor.update(Trade(20000.3, 1.0, 4, 'b', 'l'))
+    assert monitor.get_aggregate() == {200003: 2.0}
+    assert monitor.buy_volume() == 2.0
+    assert monitor.sell_volume() == 0
@@ -0,0 +1,143 @@
+import asyncio
+from typing import List
+
+import pytest
+import websockets
+
+from common.websocket_client import WebsocketClient, WebsocketHandler
+
+N_FRAMES: int = 100
+# fills the client queue (4) while staying under the socket's own frame buffer, so closing is not delayed
+N_FAILING_FRAMES: int = 20
+
+
+class RaisingHandler(WebsocketHandler):
+    def __init__(self):
+        self.messages: int = 0
+
+    async def on_message(self, message, receive_ns: int = 0) -> None:
+        self.messages += 1
+        # give the reader time to fill the queue before failing
+        await asyncio.sleep(0.05)
+        raise RuntimeError('handler failed')
+
+
+class CountingHandler(WebsocketHandler):
+    def __init__(self):
+        self.messages: int = 0
+
+    async def on_message(self, message, receive_ns: int = 0) -> None:
+        self.messages += 1
+
+
+async def _serve(frames: int):
+    async def handler(websocket, path):
+        for n in range(frames):
+            await websocket.send(str(n))
+        await websocket.wait_closed()
+    return await websockets.serve(handler, '127.0.0.1', 0)  # type: ignore[attr-defined]
+
+
+def _url(server) -> str:
+    return f'ws://127.0.0.1:{server.sockets[0].getsockname()[1]}'
+
+
+async def _assert_reader_raises(client: WebsocketClient, handler: WebsocketHandler) -> None:
+    # the reader must stop by itself, cancelling it would also surface the processor's exception
+    reader: asyncio.Task = asyncio.create_task(client.read_til_close(handler))
+    done, _ = await asyncio.wait({reader}, timeout=5)
+    if not done:
+        reader.cancel()
+    assert reader in done
+    with pytest.raises(RuntimeError, match='handler failed'):
+        reader.result()
+
+
+def test_raising_handler_with_full_queue_stops_reader():
+    async def run() -> None:
+        server = await _serve(N_FAILING_FRAMES)
+        client: WebsocketClient = WebsocketClient(_url(server), queue_size=4)
+        handler: RaisingHandler = RaisingHandler()
+        try:
+            await _assert_reader_raises(client, handler)
+            assert handler.messages == 1
+        finally:
+            server.close()
+            await server.wait_closed()
+    asyncio.run(run())
+
+
+def test_raising_handler_with_reconnect_stops_reader():
+    async def run() -> None:
+        server = await _serve(N_FAILING_FRAMES)
+        client: WebsocketClient = WebsocketClient(_url(server), reconnect=True, queue_size=4)
+        try:
+            await _assert_reader_raises(client, RaisingHandler())
+        finally:
+            server.close()
+            await server.wait_closed()
+    asyncio.run(run())
+
+
+def test_queued_reader_delivers_every_frame():
+    async def run() -> None:
+        server = await _serve(N_FRAMES)
+        client: WebsocketClient = WebsocketClient(_url(server), queue_size=4)
+        handler: CountingHandler = CountingHandler()
+        reader: asyncio.Task = asyncio.create_task(client.read_til_close(handler))
+        try:
+            for _ in range(100):
+                if handler.messages == N_FRAMES:
+                    break
+                await asyncio.sleep(0.01)
+            assert handler.messages == N_FRAMES
+            assert client.frames == N_FRAMES
+        finally:
+            await client.close()
+            await asyncio.wait_for(reader, timeout=5)
+            server.close()
+            await server.wait_closed()
+    asyncio.run(run())
+
+
+class RefusingHandler(CountingHandler):
+    def __init__(self, refusals: int):
+        super().__init__()
+        self.refusals = refusals
+        self.reconnects: int = 0
+
+    async def on_reconnect(self, client: WebsocketClient) -> bool:
+        self.reconnects += 1
+        return self.reconnects > self.refusals
+
+
+def test_refused_reconnect_is_retried():
+    async def run() -> None:
+        connections: List[int] = []
+
+        async def handler(websocket, path):
+            connections.append(1)
+            await websocket.send('frame')
+            if len(connections) == 1:
+                await websocket.close()
+            else:
+                await websocket.wait_closed()
+
+        server = await websockets.serve(handler, '127.0.0.1', 0)  # type: ignore[attr-defined]
+        client: WebsocketClient = WebsocketClient(_url(server), reconnect=True, min_backoff=0.01, max_backoff=0.02)
+        refusing: RefusingHandler = RefusingHandler(refusals=2)
+        reader: asyncio.Task = asyncio.create_task(client.read_til_close(refusing))
+        try:
+            for _ in range(200):
+                if refusing.reconnects == 3 and refusing.messages >= 2:
+                    break
+                await asyncio.sleep(0.01)
+            assert refusing.reconnects == 3
+            assert len(connections) == 4
+            assert not reader.done()
+        finally:
+            await client.close()
+            await asyncio.wait_for(reader, timeout=5)
+            server.close()
+            await server.wait_closed()
+    asyncio.run(run())
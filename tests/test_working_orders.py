@@ -0,0 +1,57 @@
+import asyncio
+import sys
+from typing import List, Optional
+
+from app.krak_trader import KrakTrader
+from common import Order, Side
+
+N_ORDERS: int = 100
+
+
+class SendingTrader(KrakTrader):
+    def __init__(self):
+        super().__init__('XBT/USD', None, None, None, None, None)  # type: ignore[arg-type]
+        self._token = 'token'
+        self.frames: List[str] = []
+
+    async def send_private_frame(self, frame: str) -> None:
+        self.frames.append(frame)
+
+
+def _status(event: str, reqid: int, txid: Optional[str] = None) -> dict:
+    return {'event': event, 'status': 'ok', 'reqid': reqid, 'txid': txid}
+
+
+async def _lifecycle(app: SendingTrader, n: int) -> None:
+    order: Order = Order('XBT/USD', Side.BUY, -sys.maxsize, 0.0001, 20000.0, 'limit', 'pendingNew', 'GTC')
+    await app.new_order_single(order)
+    await app.on_add_order_status(_status('addOrderStatus', order.clorder_id, f'NEW-{n}'))
+    working: Optional[Order] = app._workingorders.get_order(f'NEW-{n}')
+    assert working is not None
+    assert app._workingorders.get_order_by_clorder_id(order.clorder_id) is working
+
+    await app.replace_order(working, 20000.1, 0.0002)
+    await app.on_edit_order_status(_status('editOrderStatus', working.clorder_id, f'EDIT-{n}'))
+    working = app._workingorders.get_order(f'EDIT-{n}')
+    assert working is not None
+    assert working.price == 20000.1
+    assert app._workingorders.get_order_by_clorder_id(working.clorder_id) is working
+
+    await app.cancel_order(working)
+    await app.on_cancel_order_status(_status('cancelOrderStatus', working.clorder_id))
+
+
+def test_order_lifecycles_leave_no_index_entries():
+    app: SendingTrader = SendingTrader()
+
+    async def run() -> None:
+        for n in range(N_ORDERS):
+            await _lifecycle(app, n)
+    asyncio.run(run())
+
+    assert app._workingorders.orders == {}
+    assert app._workingorders.pendings == {}
+    assert app._workingorders._by_clorder_id == {}
+    assert app._workingorders._indexed_clorder_ids == {}
+    assert app._workingorders.working_qty(Side.BUY) == 0
+    assert len(app.frames) == 3 * N_ORDERS
@@ -1,17 +1,46 @@
+import json
+
+try:
+    import msgpack  # type: ignore
+except ImportError:
+    msgpack = None  # type: ignore
+
 import websockets
 
+# must match app.ui_schema
+SCHEMA_VERSION = 1
+FORMAT_JSON = 'kraktrader.v1.json'
+FORMAT_MSGPACK = 'kraktrader.v1.msgpack'
+
 
 class Consumer:
+    """
+    client of the UI feed, callbacks receive the data of each frame of their topic (see app.ui_schema)
+        - asks for msgpack frames when msgpack is installed, json otherwise
+    """
     def __init__(self, url):
         self._url = url
         self._callbacks = {}
+        self._subprotocols = [FORMAT_MSGPACK, FORMAT_JSON] if msgpack else [FORMAT_JSON]
 
     def on(self, topic, callback):
         self._callbacks[topic] = callback
 
+    @staticmethod
+    def _loads(message):
+        if isinstance(message, bytes):
+            return msgpack.unpackb(message)
+        return json.loads(message)
+
     async def start(self):
-        async for message in websockets.connect(self._url):
-            topic = message["py/object"]
-            callback = self._callbacks.get(topic)
-            if callback:
-                callback(message)
+        async for websocket in websockets.connect(self._url, subprotocols=self._subprotocols):
+            try:
+                async for message in websocket:
+                    frame = self._loads(message)
+                    if frame['v'] != SCHEMA_VERSION:
+                        raise ValueError(f'unsupported schema version {frame["v"]}, expected {SCHEMA_VERSION}')
+                    callback = self._callbacks.get(frame['topic'])
+                    if callback:
+                        callback(frame['data'])
+            except websockets.ConnectionClosed:
+                continue
@@ -316,7 +316,7 @@ function maxPriceDiff(quotes, is_bid) {
 
 function onOrderStatus(js) {
   $("#lastOrderStatus").text(
-    `${js["status"]}: ${js["desc"]} / ${js["errorMessage"]}`
+    `${js["status"]}: ${js["descr"]} / ${js["errorMessage"]}`
   )
 }
 
@@ -344,44 +344,54 @@ function onPosition(js) {
   position = js;
 }
 
-const ws = new WebSocket("ws://127.0.0.1:8889");
+const SCHEMA_VERSION = 1;
+
+function toQuotes(levels) {
+  return levels.map(([price, volume]) => ({ price: price, volume: volume }));
+}
+
+const ws = new WebSocket("ws://127.0.0.1:8889", ["kraktrader.v1.json"]);
 ws.onmessage = js => {
-  data = JSON.parse(js.data)
-  const topic = data['py/object']
-  if (topic == 'app.book.Book') {
-    data["asks"].reverse();
-    onBook(data);
-  }
-  else if (topic == 'common.Trade') {
-    onTrade(data);
-  }
-  else if (topic == 'common.Position') {
-    onPosition(data);
-  }
-  else if (topic == 'kraken.messages.SubscriptionStatus') {
-    onSubscription(data);
-  }
-  else if (topic == 'kraken.messages.SystemStatus') {
-    onSystemStatus(data);
+  const frame = JSON.parse(js.data);
+  if (frame.v != SCHEMA_VERSION) {
+    console.log(`unsupported schema version: ${frame.v}`);
+    return;
   }
-  else if (topic == "kraken.messages.OrderStatus") {
-    onOrderStatus(data);
-  }
-  else if (topic == 'kraken.SymbolConfig') {
-    onSymbolConfig(data);
-  }
-  else if (js.data != "{}" && Array.isArray(Object.values(data))){
-    if (data[0] != null && data[0]['py/object'] == 'common.Quote') {
-      onVwap(data);
-    }
-    else {
-      onWorkingOrder(Object.values(data));
+  const data = frame.data;
+  switch (frame.topic) {
+    case 'book': {
+      const asks = toQuotes(data.asks);
+      asks.reverse();
+      onBook({ symbol: data.symbol, bids: toQuotes(data.bids), asks: asks });
+      break;
     }
-  }
-  else if (js.data == "{}") {
-    onWorkingOrder(Object.values(data));
-  }
-  else {
-    console.log(`unknown topic: ${data}`);
+    case 'vwap':
+      onVwap(toQuotes(data));
+      break;
+    case 'trade':
+      onTrade({ price: data[0], volume: data[1], time: data[2], side: data[3], order_type: data[4] });
+      break;
+    case 'orders':
+      onWorkingOrder(data.map(([order_id, side, price, qty, cum_qty, status]) => (
+        { order_id: order_id, side: side, price: price, qty: qty, cum_qty: cum_qty, status: status }
+      )));
+      break;
+    case 'position':
+      onPosition({ symbol: data[0], qty: data[1], avg_price: data[2], realized_pnl: data[3], unrealized_pnl: data[4] });
+      break;
+    case 'order_status':
+      onOrderStatus(data);
+      break;
+    case 'subscription':
+      onSubscription(data);
+      break;
+    case 'system_status':
+      onSystemStatus(data);
+      break;
+    case 'symbol_config':
+      onSymbolConfig(data);
+      break;
+    default:
+      console.log(`unknown topic: ${frame.topic}`);
   }
 }